@@ -19,7 +19,7 @@ from .base import (
 )
 from .exceptions import KukurException  # noqa
 from .metadata import Metadata
-from .client import Client, TLSOptions  # noqa
+from .client import AsyncClient, Client, TLSOptions  # noqa
 
 
 @typing.runtime_checkable
@@ -85,6 +85,7 @@ class SignalGenerator(Protocol):
 
 
 __all__ = [
+    "AsyncClient",
     "Client",
     "DataType",
     "Dictionary",
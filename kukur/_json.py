@@ -0,0 +1,56 @@
+"""Fast JSON (de)serialization to and from bytes.
+
+orjson is used when it is installed. Otherwise this falls back to the json module.
+"""
+
+# SPDX-FileCopyrightText: 2025 Timeseer.AI
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+import math
+from typing import Any, Union
+
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj to compact UTF-8 encoded JSON."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    try:
+        serialized = _dumps_fallback(obj)
+    except ValueError:
+        serialized = _dumps_fallback(_replace_non_finite(obj))
+    return serialized.encode("utf-8")
+
+
+def loads(data: Union[bytes, memoryview, str]) -> Any:
+    """Deserialize JSON in bytes, a buffer or a str.
+
+    orjson reads buffers without copying them.
+    """
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def _dumps_fallback(obj: Any) -> str:
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, allow_nan=False)
+
+
+def _replace_non_finite(obj: Any) -> Any:
+    """Replace NaN and infinity by None, as orjson writes them as null."""
+    if isinstance(obj, float) and not math.isfinite(obj):
+        return None
+    if isinstance(obj, dict):
+        return {key: _replace_non_finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_replace_non_finite(value) for value in obj]
+    return obj
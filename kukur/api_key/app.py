@@ -3,15 +3,23 @@
 # SPDX-FileCopyrightText: 2021 Timeseer.AI
 #
 # SPDX-License-Identifier: Apache-2.0
+import hmac
 import os
 import secrets
+import threading
 from datetime import datetime, timezone
-from hashlib import scrypt
-from typing import List
+from hashlib import scrypt, sha256
+from typing import Dict, List
 
 from kukur.api_key import ApiKey
 from kukur.repository import RepositoryRegistry
 
+# Stored hashes of presented api keys that were valid, by a digest of the presented key.
+# Clients send their api key with every request and scrypt is slow by design.
+_VERIFIED_API_KEYS: Dict[bytes, bytes] = {}
+_VERIFIED_API_KEYS_LOCK = threading.Lock()
+MAX_VERIFIED_API_KEYS = 1024
+
 
 class ApiKeys:
     """Api keys for authentication."""
@@ -44,8 +52,21 @@ class ApiKeys:
         stored_api_key, salt = self.__repository.api_key().get(name)
         if salt is None or stored_api_key is None:
             return False
+        digest = _digest_api_key(api_key, salt)
+        with _VERIFIED_API_KEYS_LOCK:
+            verified_api_key = _VERIFIED_API_KEYS.get(digest)
+        if verified_api_key is not None and hmac.compare_digest(
+            stored_api_key, verified_api_key
+        ):
+            return True
         hashed_api_key = _hash_api_key(api_key, salt)
-        return stored_api_key == hashed_api_key
+        if not hmac.compare_digest(stored_api_key, hashed_api_key):
+            return False
+        with _VERIFIED_API_KEYS_LOCK:
+            if len(_VERIFIED_API_KEYS) >= MAX_VERIFIED_API_KEYS:
+                _VERIFIED_API_KEYS.clear()
+            _VERIFIED_API_KEYS[digest] = stored_api_key
+        return True
 
     def revoke(self, name: str) -> ApiKey:
         """Revoke an api key."""
@@ -56,6 +77,14 @@ def _create_random_api_key() -> str:
     return secrets.token_urlsafe(40)
 
 
+def _digest_api_key(api_key: str, salt: bytes) -> bytes:
+    """Return a cheap digest of a presented api key, so the key itself is not kept in memory.
+
+    The stored hash is still read for every request, so revoked keys are rejected.
+    """
+    return sha256(salt + bytes(api_key, "UTF-8")).digest()
+
+
 def _hash_api_key(api_key: str, salt: bytes) -> bytes:
     hashed = scrypt(bytes(api_key, "UTF-8"), salt=salt, n=16384, r=8, p=1)
     return hashed
@@ -3,14 +3,13 @@
 # SPDX-FileCopyrightText: 2021 Timeseer.AI
 #
 # SPDX-License-Identifier: Apache-2.0
-import json
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Generator, List, Optional, Union
 
 import pyarrow as pa
 
-from kukur import Metadata, SeriesSearch, SeriesSelector, SourceStructure
+from kukur import Metadata, SeriesSearch, SeriesSelector, SourceStructure, _json
 from kukur.api_key.app import ApiKeys
 from kukur.exceptions import UnknownSourceException
 from kukur.repository import MigrationRunner, RepositoryRegistry
@@ -80,7 +79,7 @@ class Kukur:
     def list_sources(self, *_) -> List[bytes]:
         """Return all the configured sources."""
         sources = self.__source_factory.get_source_names()
-        return [json.dumps(sources).encode()]
+        return [_json.dumps(sources)]
 
     def _get_source(self, source_name: str) -> SourceWrapper:
         source = self.__source_factory.get_source(source_name)
@@ -3,10 +3,14 @@
 # SPDX-FileCopyrightText: 2021 Timeseer.AI
 # SPDX-License-Identifier: Apache-2.0
 
+import sys
 from dataclasses import dataclass
-from dataclasses import field as data_field
 from enum import Enum
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Literals with a space are not interned automatically. Use one shared object for
+# the series name tag so equality checks against it can hit the identity fast path.
+_SERIES_NAME_TAG = sys.intern("series name")
 
 
 @dataclass
@@ -20,21 +24,36 @@ class Dictionary:
     series to a user.
 
     In Python 3.8+, iteration over a dict keeps the insert ordering.
+
+    The mapping should not be modified after creation.
     """
 
+    __slots__ = ("mapping", "_items")
+
     mapping: Dict[int, str]
 
+    def __post_init__(self):
+        self._items = tuple(self.mapping.items())
+
+    def to_data(self) -> List[Tuple[int, str]]:
+        """Convert to a JSON list of (number, label) pairs."""
+        return list(self._items)
+
 
 @dataclass
 class SeriesSearch:
     """SeriesSearch is the series selector to search series.
 
     The field can be optional to allow searching for anything.
+
+    Selectors are hashable and cache their name: do not modify them after creation.
     """
 
+    __slots__ = ("source", "tags", "field", "_name")
+
     source: str
-    tags: Dict[str, str] = data_field(default_factory=dict)
-    field: Optional[str] = None
+    tags: Dict[str, str]
+    field: Optional[str]
 
     def __init__(
         self,
@@ -42,14 +61,13 @@ class SeriesSearch:
         tags: Optional[Union[str, Dict[str, str]]] = None,
         field: Optional[str] = None,
     ):
-        tags_dict = {}
-        if isinstance(tags, str):
-            tags_dict["series name"] = tags
-        if isinstance(tags, dict):
-            tags_dict = tags
         self.source = source
-        self.tags = tags_dict
+        self.tags = _to_tags(tags)
         self.field = field
+        self._name: Optional[str] = None
+
+    def __hash__(self) -> int:
+        return hash((self.source, frozenset(self.tags.items()), self.field))
 
     @property
     def name(self) -> str:
@@ -57,13 +75,12 @@ class SeriesSearch:
 
         For sources that cannot handle tags and fields yet.
         """
-        series_tags: List[str] = []
-        for tag_key, tag_value in self.tags.items():
-            if tag_key == "series name":
-                series_tags.insert(0, tag_value)
-                continue
-            series_tags.append(f"{tag_key}={tag_value}")
-        series_string = ",".join(series_tags)
+        if self._name is None:
+            self._name = self._format_name()
+        return self._name
+
+    def _format_name(self) -> str:
+        series_string = _format_tags(self.tags)
         if self.field is None:
             return f"{series_string}"
         return f"{series_string}::{self.field}"
@@ -77,7 +94,11 @@ class SeriesSearch:
 class SeriesSelector(SeriesSearch):
     """SeriesSelector identifies a group of time series matching the given pattern."""
 
-    field: str = "value"
+    __slots__ = ()
+
+    field: str
+
+    __hash__ = SeriesSearch.__hash__
 
     def __init__(
         self,
@@ -85,8 +106,10 @@ class SeriesSelector(SeriesSearch):
         tags: Optional[Union[str, Dict[str, str]]] = None,
         field: str = "value",
     ):
-        super().__init__(source, tags)
+        self.source = source
+        self.tags = _to_tags(tags)
         self.field = field
+        self._name = None
 
     @classmethod
     def from_tags(cls, source: str, tags: Dict[str, str], field: Optional[str] = None):
@@ -100,7 +123,7 @@ class SeriesSelector(SeriesSearch):
         """Create a SeriesSelector from a dictionary."""
         tags = data.get("tags", {})
         if "name" in data and "tags" not in data:
-            tags["series name"] = data["name"]
+            tags[_SERIES_NAME_TAG] = data["name"]
         return cls(data["source"], tags, data.get("field", "value"))
 
     @classmethod
@@ -114,7 +137,7 @@ class SeriesSelector(SeriesSearch):
         for tag_part in field_parts[0].split(","):
             parts = tag_part.split("=", maxsplit=1)
             if len(parts) == 1:
-                tags["series name"] = parts[0]
+                tags[_SERIES_NAME_TAG] = parts[0]
             else:
                 tags[parts[0]] = parts[1]
 
@@ -124,34 +147,51 @@ class SeriesSelector(SeriesSearch):
         """Convert to JSON object."""
         return dict(source=self.source, tags=self.tags, field=self.field)
 
-    @property
-    def name(self) -> str:
-        """Get the series name with tags and fields included.
-
-        For sources that cannot handle tags and fields yet.
-        """
-        series_tags: List[str] = []
-        for tag_key, tag_value in self.tags.items():
-            if tag_key == "series name":
-                series_tags.insert(0, tag_value)
-                continue
-            series_tags.append(f"{tag_key}={tag_value}")
-        series_string = ",".join(series_tags)
+    def _format_name(self) -> str:
+        series_string = _format_tags(self.tags)
         if self.field == "value":
             return f"{series_string}"
         return f"{series_string}::{self.field}"
 
 
-class InterpolationType(Enum):
-    """InterpolationType describes how the value of a series evolves between data points."""
+def _to_tags(tags: Optional[Union[str, Dict[str, str]]]) -> Dict[str, str]:
+    """Accept a series name as shorthand for tags with only a series name."""
+    if isinstance(tags, str):
+        return {_SERIES_NAME_TAG: tags}
+    if isinstance(tags, dict):
+        return tags
+    return {}
+
+
+def _format_tags(tags: Dict[str, str]) -> str:
+    """Format tags as a name, with the series name first when present."""
+    series_name: Optional[str] = None
+    series_tags: List[str] = []
+    for tag_key, tag_value in tags.items():
+        if tag_key == _SERIES_NAME_TAG:
+            series_name = tag_value
+            continue
+        series_tags.append(f"{tag_key}={tag_value}")
+    if series_name is not None:
+        series_tags = [series_name, *series_tags]
+    return ",".join(series_tags)
+
+
+class InterpolationType(str, Enum):
+    """InterpolationType describes how the value of a series evolves between data points.
+
+    Members are strings themselves and compare equal to their value.
+    """
 
     LINEAR = "LINEAR"
     STEPPED = "STEPPED"
 
 
-class DataType(Enum):
+class DataType(str, Enum):
     """DataType represents the data type of the values in a time series.
 
+    Members are strings themselves and compare equal to their value.
+
     FLOAT32 is a 32 bit floating point number
     FLOAT64 is a 64 bit floating point number
     STRING is a variable length utf-8 character array
@@ -7,17 +7,19 @@ This allows launching Kukur as a service or testing data sources.
 # SPDX-License-Identifier: Apache-2.0
 
 import argparse
+from typing import TYPE_CHECKING, Callable, Dict
 
 import kukur.logging
 import kukur.subcommands as subcommand
-from kukur.app import Kukur
 from kukur.config import from_toml
-from kukur.flight import (
-    JSONFlightServer,
-    KukurFlightServer,
-    KukurServerAuthHandler,
-    KukurServerNoAuthHandler,
-)
+
+if TYPE_CHECKING:
+    from kukur.app import Kukur
+
+_APP_ACTIONS: Dict[str, Callable[["Kukur", argparse.Namespace], None]] = {
+    "api-key": subcommand.api_key.run,
+    "test": subcommand.test_source.run,
+}
 
 
 def parse_args():
@@ -46,7 +48,14 @@ def parse_args():
     return parser.parse_args()
 
 
-def _serve(kukur_app: Kukur, server_config):
+def _serve(kukur_app: "Kukur", server_config):
+    from kukur.flight import (
+        JSONFlightServer,
+        KukurFlightServer,
+        KukurServerAuthHandler,
+        KukurServerNoAuthHandler,
+    )
+
     service = KukurFlightServer(kukur_app)
 
     auth_handler = KukurServerAuthHandler(kukur_app)
@@ -58,6 +67,8 @@ def _serve(kukur_app: Kukur, server_config):
     server = JSONFlightServer(server_config, auth_handler=auth_handler)
     server.register_action_handler("search", service.search)
     server.register_action_handler("get_metadata", service.get_metadata)
+    server.register_action_handler("get_metadata_batch", service.get_metadata_batch)
+    server.register_get_handler("search", service.search_table)
     server.register_get_handler("get_data", service.get_data)
     server.register_get_handler("get_plot_data", service.get_plot_data)
     server.register_action_handler("list_sources", kukur_app.list_sources)
@@ -69,15 +80,18 @@ def _run() -> None:
     args = parse_args()
     config = from_toml(args.config_file)
     kukur.logging.configure(config)
-    app = Kukur(config)
-    if args.action == "test":
-        subcommand.test_source.run(app, args)
-    elif args.action == "api-key":
-        subcommand.api_key.run(app, args)
-    elif args.action == "inspect":
+    if args.action == "inspect":
         subcommand.inspect.run(args)
-    else:
+        return
+
+    from kukur.app import Kukur
+
+    app = Kukur(config)
+    action = _APP_ACTIONS.get(args.action)
+    if action is None:
         _serve(app, config)
+    else:
+        action(app, args)
 
 
 if __name__ == "__main__":
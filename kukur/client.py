@@ -3,17 +3,37 @@
 # SPDX-FileCopyrightText: 2021 Timeseer.AI
 # SPDX-License-Identifier: Apache-2.0
 
-import json
+import asyncio
+import functools
+import hashlib
 import os
 import ssl
+import threading
+import time
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from typing import Any, Dict, Generator, List, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncGenerator, Dict, Generator, List, Optional, Tuple, Union
 
 import pyarrow as pa
 import pyarrow.flight as fl
 
-from kukur import Metadata, SeriesSearch, SeriesSelector, SourceStructure
+from kukur import Metadata, SeriesSearch, SeriesSelector, SourceStructure, _json
+
+# Give each FlightClient its own gRPC connections. With the global subchannel pool,
+# clients to the same server share one connection and block each other under load.
+_GRPC_OPTIONS = [("grpc.use_local_subchannel_pool", 1)]
+
+_ONE_YEAR = timedelta(days=365)
+
+# Sources are configured when Kukur starts. Keep the list for a while to avoid a round-trip per call.
+_SOURCES_TTL_SECONDS = 60.0
+
+# Authentication tokens and the time they were received, by (host, port, key name, key digest).
+# Clients that connect to the same Kukur instance with the same api key reuse the token and skip the handshake.
+_TOKEN_CACHE: Dict[Tuple[str, int, str, bytes], Tuple[bytes, float]] = {}
+_TOKEN_CACHE_LOCK = threading.Lock()
+_TOKEN_TTL_SECONDS = 3600.0
+_MAX_CACHED_TOKENS = 64
 
 
 @dataclass
@@ -26,14 +46,21 @@ class TLSOptions:
     Alternative certificates can be provided using `root_certs`.
     """
 
-    verify: bool = True
-    root_certs: Optional[bytes] = None
+    __slots__ = ("verify", "root_certs")
+
+    verify: bool
+    root_certs: Optional[bytes]
+
+    def __init__(self, verify: bool = True, root_certs: Optional[bytes] = None):
+        self.verify = verify
+        self.root_certs = root_certs
 
 
 class Client:
     """Client connects to Kukur using Arrow Flight."""
 
     _client: fl.FlightClient = None
+    _call_options: Optional[fl.FlightCallOptions] = None
 
     def __init__(
         self,
@@ -55,6 +82,9 @@ class Client:
         self._host = host
         self._port = port
         self._api_key = api_key
+        self._lock = threading.Lock()
+        self._sources: Optional[List[str]] = None
+        self._sources_time = 0.0
 
         self._tls_options = None
         if use_tls is True:
@@ -106,16 +136,40 @@ class Client:
             The return value depends on the search that is supported by the source.
         """
         body = selector.to_data()
-        results = list(
-            self._get_client().do_action(("search", json.dumps(body).encode()))
-        )
+        results = self._do_action(("search", _json.dumps(body)))
         for result in results:
-            data = json.loads(result.body.to_pybytes())
+            data = _json.loads(memoryview(result.body))
             if "series" not in data:
                 yield SeriesSelector.from_data(data)
             else:
                 yield _read_metadata(data)
 
+    def search_batch(
+        self, selector: SeriesSearch
+    ) -> Generator[Union[Metadata, SeriesSelector], None, None]:
+        """Search Kukur for time series matching the given ``SeriesSelector``.
+
+        This returns the same results as ``search``, but Kukur sends them in Arrow record batches
+        instead of one message per time series. This is faster for sources with many time series.
+        The Kukur instance needs to support this.
+
+        Args:
+            selector: return time series matching the given selector.
+                      Use ``name = None`` (the default) to select all series in a source.
+
+        Returns:
+            A generator that returns either ``Metadata`` or ``SeriesSelector``s.
+            The return value depends on the search that is supported by the source.
+        """
+        query = {"query": "search", "selector": selector.to_data()}
+        for chunk in self._do_get(fl.Ticket(_json.dumps(query))):
+            for row in chunk.data.to_pylist():
+                series = SeriesSelector(row["source"], dict(row["tags"]), row["field"])
+                if row["metadata"] is None:
+                    yield series
+                else:
+                    yield Metadata.from_data(_json.loads(row["metadata"]), series)
+
     def get_metadata(self, selector: SeriesSelector) -> Metadata:
         """Read metadata for the time series selected by the ``SeriesSelector``.
 
@@ -126,13 +180,25 @@ class Client:
             The ``Metadata`` for the time series.
         """
         body = selector.to_data()
-        results = list(
-            self._get_client().do_action(("get_metadata", json.dumps(body).encode()))
-        )
-        result = results[0]
-        data = json.loads(result.body.to_pybytes())
+        result = next(iter(self._do_action(("get_metadata", _json.dumps(body)))))
+        data = _json.loads(memoryview(result.body))
         return _read_metadata(data)
 
+    def get_metadata_many(self, selectors: List[SeriesSelector]) -> List[Metadata]:
+        """Read metadata for many time series in one request.
+
+        Args:
+            selectors: the selected time series
+
+        Returns:
+            The ``Metadata`` for each time series, in the order of the selectors.
+        """
+        body = [selector.to_data() for selector in selectors]
+        results = self._do_action(("get_metadata_batch", _json.dumps(body)))
+        return [
+            _read_metadata(_json.loads(memoryview(result.body))) for result in results
+        ]
+
     def get_data(
         self,
         selector: SeriesSelector,
@@ -149,15 +215,28 @@ class Client:
         Returns:
             A pyarrow Table with two columns: 'ts' and 'value'.
         """
-        start_date, end_date = _apply_default_range(start_date, end_date)
-        query = {
-            "query": "get_data",
-            "selector": selector.to_data(),
-            "start_date": start_date.isoformat(),
-            "end_date": end_date.isoformat(),
-        }
-        ticket = fl.Ticket(json.dumps(query))
-        return self._get_client().do_get(ticket).read_all()
+        ticket = _get_data_ticket(selector, start_date, end_date)
+        return self._do_get(ticket).read_all()
+
+    def get_data_stream(
+        self,
+        selector: SeriesSelector,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> Generator[pa.RecordBatch, None, None]:
+        """Get raw data for the time series selected by the SeriesSelector as it arrives.
+
+        Args:
+            selector: return data for the time series selected by this selector.
+            start_date: the start date of the time range of data to return. Defaults to one year ago.
+            end_date: the end date of the time range of data to return. Defaults to now.
+
+        Returns:
+            A generator of pyarrow RecordBatches with two columns: 'ts' and 'value'.
+        """
+        ticket = _get_data_ticket(selector, start_date, end_date)
+        for chunk in self._do_get(ticket):
+            yield chunk.data
 
     def get_plot_data(
         self,
@@ -185,18 +264,30 @@ class Client:
             "end_date": end_date.isoformat(),
             "interval_count": interval_count,
         }
-        ticket = fl.Ticket(json.dumps(query))
-        return self._get_client().do_get(ticket).read_all()
+        ticket = fl.Ticket(_json.dumps(query))
+        return self._do_get(ticket).read_all()
 
     def list_sources(self) -> List[str]:
         """List all configured sources.
 
         Returns:
             A list of source names that are configured in Kukur.
+            The list is cached for a minute. Use ``invalidate_sources`` to refresh it earlier.
+        """
+        now = time.monotonic()
+        sources = self._sources
+        if sources is None or now - self._sources_time >= _SOURCES_TTL_SECONDS:
+            sources = self._request_sources()
+            self._sources = sources
+            self._sources_time = now
+        return list(sources)
+
+    def invalidate_sources(self):
+        """Forget the cached list of sources.
+
+        The next call to ``list_sources`` will request the sources from Kukur.
         """
-        results = list(self._get_client().do_action(("list_sources")))
-        data = json.loads(results[0].body.to_pybytes())
-        return data
+        self._sources = None
 
     def get_source_structure(
         self, selector: SeriesSelector
@@ -207,57 +298,267 @@ class Client:
             A list of tag keys, tag values and fields that are configured in the source.
         """
         body = selector.to_data()
-        results = list(
-            self._get_client().do_action(
-                ("get_source_structure", json.dumps(body).encode())
-            )
+        result = next(
+            iter(self._do_action(("get_source_structure", _json.dumps(body))))
         )
-        data = json.loads(results[0].body.to_pybytes())
+        data = _json.loads(memoryview(result.body))
         if data is None:
             return None
         return SourceStructure.from_data(data)
 
-    def _get_client(self) -> Any:
-        if self._client is None:
-            extra_args: Dict[str, Any] = {}
-
-            if self._tls_options is not None:
-                location = fl.Location.for_grpc_tls(self._host, self._port)
-                if self._tls_options.root_certs is not None:
-                    extra_args["tls_root_certs"] = self._tls_options.root_certs
-                elif os.name == "nt":
-                    extra_args["tls_root_certs"] = _get_os_ca_certs()
-                if not self._tls_options.verify:
-                    extra_args["disable_server_verification"] = True
-            else:
-                location = fl.Location.for_grpc_tcp(self._host, self._port)
+    def close(self):
+        """Close the connection to Kukur.
+
+        A new connection will be opened when the client is used again.
+        """
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+                self._call_options = None
 
-            self._client = fl.FlightClient(location, **extra_args)
-            if self._api_key != ("", ""):
-                self._client.authenticate(ClientAuthenticationHandler(self._api_key))
+    def _get_client(self) -> Any:
+        with self._lock:
+            if self._client is None:
+                self._connect()
         return self._client
 
+    def _connect(self):
+        extra_args: Dict[str, Any] = {}
+
+        if self._tls_options is not None:
+            location = fl.Location.for_grpc_tls(self._host, self._port)
+            if self._tls_options.root_certs is not None:
+                extra_args["tls_root_certs"] = self._tls_options.root_certs
+            elif os.name == "nt":
+                extra_args["tls_root_certs"] = _get_os_ca_certs()
+            if not self._tls_options.verify:
+                extra_args["disable_server_verification"] = True
+        else:
+            location = fl.Location.for_grpc_tcp(self._host, self._port)
+
+        self._client = fl.FlightClient(
+            location, generic_options=_GRPC_OPTIONS, **extra_args
+        )
+        if self._api_key != ("", ""):
+            self._authenticate()
+
+    def _authenticate(self):
+        token_key = self._get_token_key()
+        now = time.monotonic()
+        with _TOKEN_CACHE_LOCK:
+            cached_token = _TOKEN_CACHE.get(token_key)
+        if cached_token is not None and now - cached_token[1] < _TOKEN_TTL_SECONDS:
+            self._call_options = fl.FlightCallOptions(
+                headers=[(b"auth-token-bin", cached_token[0])]
+            )
+            return
+        auth_handler = ClientAuthenticationHandler(self._api_key)
+        self._client.authenticate(auth_handler)
+        with _TOKEN_CACHE_LOCK:
+            if len(_TOKEN_CACHE) >= _MAX_CACHED_TOKENS:
+                _TOKEN_CACHE.clear()
+            _TOKEN_CACHE[token_key] = (auth_handler.get_token(), now)
+
+    def _get_token_key(self) -> Tuple[str, int, str, bytes]:
+        name, key = self._api_key
+        return (self._host, self._port, name, hashlib.sha256(key.encode()).digest())
+
+    def _forget_token(self) -> bool:
+        """Forget a cached token that was rejected, so the next request authenticates again.
+
+        Returns False when the connection did not use a cached token.
+        """
+        if self._call_options is None:
+            return False
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE.pop(self._get_token_key(), None)
+        self.close()
+        return True
+
+    def _do_action(self, action: Any) -> Generator[Any, None, None]:
+        results = self._get_client().do_action(action, options=self._call_options)
+        try:
+            first_result = next(results, None)
+        except fl.FlightUnauthenticatedError:
+            if not self._forget_token():
+                raise
+            results = self._get_client().do_action(action, options=self._call_options)
+            first_result = next(results, None)
+        if first_result is None:
+            return
+        yield first_result
+        yield from results
+
+    def _do_get(self, ticket: fl.Ticket) -> fl.FlightStreamReader:
+        try:
+            return self._get_client().do_get(ticket, options=self._call_options)
+        except fl.FlightUnauthenticatedError:
+            if not self._forget_token():
+                raise
+            return self._get_client().do_get(ticket, options=self._call_options)
+
+    def _request_sources(self) -> List[str]:
+        result = next(iter(self._do_action(("list_sources"))))
+        return _json.loads(memoryview(result.body))
+
+
+class AsyncClient:
+    """AsyncClient runs the requests of a Client in worker threads for use with asyncio.
+
+    Requests for many time series can be sent concurrently, for example using ``asyncio.gather``.
+    """
+
+    def __init__(self, client: Client):
+        """Create a new AsyncClient.
+
+        Args:
+            client: the Client that is used to send requests.
+        """
+        self._client = client
+
+    async def search(
+        self, selector: SeriesSearch
+    ) -> List[Union[Metadata, SeriesSelector]]:
+        """Search Kukur for time series matching the given ``SeriesSelector``.
+
+        See ``Client.search``. All results are returned at once.
+        """
+        return await asyncio.to_thread(lambda: list(self._client.search(selector)))
+
+    async def get_metadata(self, selector: SeriesSelector) -> Metadata:
+        """Read metadata for the time series selected by the ``SeriesSelector``.
+
+        See ``Client.get_metadata``.
+        """
+        return await asyncio.to_thread(self._client.get_metadata, selector)
+
+    async def get_data(
+        self,
+        selector: SeriesSelector,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> pa.Table:
+        """Get raw data for the time series selected by the SeriesSelector.
+
+        See ``Client.get_data``.
+        """
+        return await asyncio.to_thread(
+            self._client.get_data, selector, start_date, end_date
+        )
+
+    async def get_plot_data(
+        self,
+        selector: SeriesSelector,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        interval_count: int = 200,
+    ) -> pa.Table:
+        """Get plot data for the time series selected by the SeriesSelector.
+
+        See ``Client.get_plot_data``.
+        """
+        return await asyncio.to_thread(
+            self._client.get_plot_data, selector, start_date, end_date, interval_count
+        )
+
+    async def search_batch(
+        self, selector: SeriesSearch
+    ) -> List[Union[Metadata, SeriesSelector]]:
+        """Search Kukur for time series using Arrow record batches.
+
+        See ``Client.search_batch``. All results are returned at once.
+        """
+        return await asyncio.to_thread(
+            lambda: list(self._client.search_batch(selector))
+        )
+
+    async def get_metadata_many(
+        self, selectors: List[SeriesSelector]
+    ) -> List[Metadata]:
+        """Read metadata for many time series in one request.
+
+        See ``Client.get_metadata_many``.
+        """
+        return await asyncio.to_thread(self._client.get_metadata_many, selectors)
+
+    async def get_data_stream(
+        self,
+        selector: SeriesSelector,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ) -> AsyncGenerator[pa.RecordBatch, None]:
+        """Get raw data for the time series selected by the SeriesSelector as it arrives.
+
+        See ``Client.get_data_stream``. Each batch is read in a worker thread.
+        """
+        batches = self._client.get_data_stream(selector, start_date, end_date)
+        while True:
+            batch = await asyncio.to_thread(next, batches, None)
+            if batch is None:
+                break
+            yield batch
+
+    async def list_sources(self) -> List[str]:
+        """List all configured sources.
+
+        See ``Client.list_sources``.
+        """
+        return await asyncio.to_thread(self._client.list_sources)
+
+    async def get_source_structure(
+        self, selector: SeriesSelector
+    ) -> Optional[SourceStructure]:
+        """List all tags and fields from a source.
+
+        See ``Client.get_source_structure``.
+        """
+        return await asyncio.to_thread(self._client.get_source_structure, selector)
+
+    async def close(self):
+        """Close the connection to Kukur.
+
+        See ``Client.close``.
+        """
+        await asyncio.to_thread(self._client.close)
+
 
 def _read_metadata(data: Dict[str, Any]) -> Metadata:
     return Metadata.from_data(data)
 
 
+def _get_data_ticket(
+    selector: SeriesSelector,
+    start_date: Optional[datetime],
+    end_date: Optional[datetime],
+) -> fl.Ticket:
+    start_date, end_date = _apply_default_range(start_date, end_date)
+    query = {
+        "query": "get_data",
+        "selector": selector.to_data(),
+        "start_date": start_date.isoformat(),
+        "end_date": end_date.isoformat(),
+    }
+    return fl.Ticket(_json.dumps(query))
+
+
 def _apply_default_range(
     start_date: Optional[datetime], end_date: Optional[datetime]
 ) -> Tuple[datetime, datetime]:
     if start_date is None or end_date is None:
         now = datetime.now(tz=timezone.utc)
         if start_date is None:
-            start_date = now.replace(year=now.year - 1)
+            start_date = now - _ONE_YEAR
         if end_date is None:
             end_date = now
     return start_date, end_date
 
 
+@functools.lru_cache(maxsize=1)
 def _get_os_ca_certs() -> bytes:
     ctx = ssl.create_default_context()
     certs = ctx.get_ca_certs(binary_form=True)
-    return "\n".join([ssl.DER_cert_to_PEM_cert(cert) for cert in certs]).encode("utf-8")
+    return b"\n".join(ssl.DER_cert_to_PEM_cert(cert).encode() for cert in certs)
 
 
 class ClientAuthenticationHandler(fl.ClientAuthHandler):
@@ -5,14 +5,21 @@
 
 import glob
 import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 
-import toml
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib
 
 from kukur.exceptions import KukurException
 
 logger = logging.getLogger(__name__)
 
+_MAX_INCLUDE_READERS = 16
+
 
 class InvalidIncludeException(KukurException):
     """Raised when the include configuration is invalid."""
@@ -22,14 +29,18 @@ class InvalidIncludeException(KukurException):
 
 
 def from_toml(path):
-    """Read the configuration from a TOML file, processing includes."""
+    """Read the configuration from a TOML file, processing includes.
+
+    Included files are read concurrently, but merged in order.
+    """
     config = _read_toml(path)
-    for include_options in config.get("include", []):
-        if "glob" not in include_options:
-            raise InvalidIncludeException('"glob" is required')
-        for include_path in sorted(glob.glob(include_options["glob"])):
-            include_config = _read_toml(include_path)
-            merge_fragment(config, include_config)
+    with ThreadPoolExecutor(max_workers=_MAX_INCLUDE_READERS) as executor:
+        for include_options in config.get("include", []):
+            if "glob" not in include_options:
+                raise InvalidIncludeException('"glob" is required')
+            include_paths = sorted(glob.glob(include_options["glob"]))
+            for include_config in executor.map(_read_toml, include_paths):
+                merge_fragment(config, include_config)
     return config
 
 
@@ -60,7 +71,8 @@ def _update_dict(existing: Dict, new: Dict):
 
 def _read_toml(path):
     try:
-        return toml.load(path)
+        with open(path, "rb") as toml_file:
+            return tomllib.load(toml_file)
     except Exception as err:
         logger.error("error in %s", path)
         raise err
@@ -3,18 +3,32 @@
 # SPDX-FileCopyrightText: 2021 Timeseer.AI
 #
 # SPDX-License-Identifier: Apache-2.0
-import json
-from typing import Any, Callable, Dict, Generator, List
+from datetime import datetime
+from typing import Any, Callable, Dict, Generator, List, Optional
 
+import pyarrow as pa
 import pyarrow.flight as fl
 from dateutil.parser import parse as parse_date
 
-from kukur import PlotSource, SeriesSelector, Source, TagSource
+from kukur import Metadata, PlotSource, SeriesSelector, Source, TagSource, _json
+from kukur.api_key.app import ApiKeys
 from kukur.app import Kukur
 from kukur.exceptions import InvalidSourceException
 
 __all__ = ["JSONFlightServer"]
 
+# Send large tables in several messages, so clients can process batches while data arrives.
+MAX_BATCH_ROWS = 65536
+
+_SEARCH_SCHEMA = pa.schema(
+    [
+        ("source", pa.string()),
+        ("tags", pa.map_(pa.string(), pa.string())),
+        ("field", pa.string()),
+        ("metadata", pa.string()),
+    ]
+)
+
 
 class JSONFlightServer(fl.FlightServerBase):
     """JSONFlightServer handles JSON Apache Arrow Flight tickets.
@@ -58,7 +72,7 @@ class JSONFlightServer(fl.FlightServerBase):
 
     def do_get(self, context, ticket: fl.Ticket):
         """Respond with Arrow columnar data to the given ticket."""
-        request = json.loads(ticket.ticket)
+        request = _json.loads(ticket.ticket)
 
         return self.__get_handlers[request["query"]](context, request)
 
@@ -73,65 +87,120 @@ class KukurFlightServer:
     def __init__(self, source: Source):
         self.__source = source
 
-    def search(self, _, action: fl.Action) -> Generator[bytes, None, None]:
+    def search(self, _, action: fl.Action) -> List[bytes]:
         """Search a data source for time series.
 
         This returns either a SeriesSelector or Metadata as JSON, depending on
         what is supported by the source.
+
+        Large sources should be searched with the 'search' GET handler instead.
         """
-        request = json.loads(action.body.to_pybytes())
+        request = _json.loads(memoryview(action.body))
         selector = SeriesSelector.from_data(request)
+        dumps = _json.dumps
+        return [dumps(result.to_data()) for result in self.__source.search(selector)]
+
+    def search_table(self, _, request) -> Any:
+        """Search a data source for time series and return all results as Arrow data.
+
+        Each row contains the selector of a time series. The metadata column contains
+        the Metadata as JSON when it is supported by the source.
+        """
+        selector = SeriesSelector.from_data(request["selector"])
+        sources: List[str] = []
+        tags: List[Dict[str, str]] = []
+        fields: List[str] = []
+        metadata: List[Optional[bytes]] = []
         for result in self.__source.search(selector):
-            yield json.dumps(result.to_data()).encode()
+            if isinstance(result, Metadata):
+                series = result.series
+                data = result.to_data()
+                del data["series"]
+                metadata.append(_json.dumps(data))
+            else:
+                series = result
+                metadata.append(None)
+            sources.append(series.source)
+            tags.append(series.tags)
+            fields.append(series.field)
+        table = pa.Table.from_arrays(
+            [
+                pa.array(sources, type=pa.string()),
+                pa.array(tags, type=pa.map_(pa.string(), pa.string())),
+                pa.array(fields, type=pa.string()),
+                pa.array(metadata, type=pa.string()),
+            ],
+            schema=_SEARCH_SCHEMA,
+        )
+        return fl.RecordBatchStream(table)
 
     def get_metadata(self, _, action: fl.Action) -> List[bytes]:
         """Return metadata for the given time series as JSON."""
-        request = json.loads(action.body.to_pybytes())
+        request = _json.loads(memoryview(action.body))
         selector = SeriesSelector.from_data(request)
         metadata = self.__source.get_metadata(selector).to_data()
-        return [json.dumps(metadata).encode()]
+        return [_json.dumps(metadata)]
+
+    def get_metadata_batch(self, _, action: fl.Action) -> Generator[bytes, None, None]:
+        """Return metadata for each of the given time series as JSON.
+
+        The request is a list of selectors. One result is returned per selector, in order.
+        """
+        request = _json.loads(memoryview(action.body))
+        for selector_data in request:
+            selector = SeriesSelector.from_data(selector_data)
+            metadata = self.__source.get_metadata(selector).to_data()
+            yield _json.dumps(metadata)
 
     def get_data(self, _, request) -> Any:
         """Return time series data as Arrow data."""
         selector = SeriesSelector.from_data(request["selector"])
-        start_date = parse_date(request["start_date"])
-        end_date = parse_date(request["end_date"])
+        start_date = _parse_date(request["start_date"])
+        end_date = _parse_date(request["end_date"])
         data = self.__source.get_data(selector, start_date, end_date)
-        return fl.RecordBatchStream(data)
+        return fl.RecordBatchStream(data.to_reader(max_chunksize=MAX_BATCH_ROWS))
 
     def get_plot_data(self, _, request) -> Any:
         """Return plot data as Arrow."""
         selector = SeriesSelector.from_data(request["selector"])
-        start_date = parse_date(request["start_date"])
-        end_date = parse_date(request["end_date"])
+        start_date = _parse_date(request["start_date"])
+        end_date = _parse_date(request["end_date"])
         interval_count: int = request["interval_count"]
         if not isinstance(self.__source, PlotSource):
             raise InvalidSourceException("get_plot_data not supported by source")
         data = self.__source.get_plot_data(
             selector, start_date, end_date, interval_count
         )
-        return fl.RecordBatchStream(data)
+        return fl.RecordBatchStream(data.to_reader(max_chunksize=MAX_BATCH_ROWS))
 
     def get_source_structure(self, _, action: fl.Action) -> List[bytes]:
         """Return the structure of a source for the given time series as JSON."""
-        request = json.loads(action.body.to_pybytes())
+        request = _json.loads(memoryview(action.body))
         selector = SeriesSelector.from_data(request)
         if not isinstance(self.__source, TagSource):
             raise InvalidSourceException("get_source_structure not supported by source")
         source_structure = self.__source.get_source_structure(selector)
         if source_structure is None:
-            return [json.dumps(source_structure).encode()]
-        return [json.dumps(source_structure.to_data()).encode()]
+            return [_json.dumps(source_structure)]
+        return [_json.dumps(source_structure.to_data())]
+
+
+def _parse_date(value: str) -> datetime:
+    """Parse an ISO 8601 date, falling back to dateutil for other formats."""
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        return parse_date(value)
 
 
 class KukurServerAuthHandler(fl.ServerAuthHandler):
     """KukurServerAuthHandler handles the authentication."""
 
-    _app: Kukur
+    _api_keys: ApiKeys
 
     def __init__(self, app: Kukur):
         super().__init__()
-        self._app = app
+        self._api_keys = app.get_api_keys()
 
     def authenticate(self, outgoing, incoming):  # pylint: disable=no-self-use
         """Check the authentication."""
@@ -140,7 +209,7 @@ class KukurServerAuthHandler(fl.ServerAuthHandler):
 
     def is_valid(self, token: bytes):
         """Check if the supplied token is valid."""
-        if token == "" or token is None:
+        if not token:
             raise fl.FlightUnauthenticatedError("invalid token")
 
         auth = fl.BasicAuth.deserialize(token)
@@ -149,9 +218,7 @@ class KukurServerAuthHandler(fl.ServerAuthHandler):
         if auth.password is None:
             raise fl.FlightUnauthenticatedError("invalid password")
 
-        if not self._app.get_api_keys().has_api_key(auth.username.decode("UTF-8")):
-            raise fl.FlightUnauthenticatedError("invalid token")
-        if not self._app.get_api_keys().is_valid(
+        if not self._api_keys.is_valid(
             auth.username.decode("UTF-8"), auth.password.decode("UTF-8")
         ):
             raise fl.FlightUnauthenticatedError("invalid token")
@@ -38,7 +38,7 @@ class ResourceType(Enum):
     """A type of resource that supports inspection."""
 
     ARROW = "arrow"
-    ARROWS = "arrow"
+    ARROWS = "arrows"
     CSV = "csv"
     DELTA = "delta"
     DIRECTORY = "directory"
@@ -53,6 +53,8 @@ class ResourceType(Enum):
 class InspectedPath:
     """A path to a resource that can be inspected."""
 
+    __slots__ = ("resource_type", "path")
+
     resource_type: ResourceType
     path: str
 
@@ -65,12 +67,19 @@ class DataOptions:
     `csv_delimiter` defines the delimiter used to separate columns in CSV files.
     `csv_header_row` indicates that the first row of a CSV file is a header row.
     `default_resource_type` assumes files without extension are of this type.
+    `batch_readahead` is the number of record batches to read ahead when reading files.
+    `fragment_readahead` is the number of files to read ahead when reading directories.
+    `batch_size` is the maximum number of rows per record batch when reading files.
+    Smaller batches use less memory per batch, larger batches have less overhead per row.
     """
 
     column_names: Optional[List[str]] = None
     csv_delimiter: Optional[str] = None
     csv_header_row: bool = True
     default_resource_type: Optional[ResourceType] = None
+    batch_readahead: Optional[int] = None
+    fragment_readahead: Optional[int] = None
+    batch_size: Optional[int] = None
 
 
 @dataclass
@@ -80,11 +89,13 @@ class FileOptions:
     `detect_delta`: enable to try to detect Delta tables
     `default_resource_type`: assume files without extension are of this type.
     `recursive`: recurse into subdirectories when inspecting directories.
+    `flat_scan`: detect Delta tables using one recursive listing instead of one per directory.
     """
 
     detect_delta: bool = False
     default_resource_type: Optional[ResourceType] = None
     recursive: bool = False
+    flat_scan: bool = False
 
     @classmethod
     def from_data(cls, data: Dict) -> "FileOptions":
@@ -96,6 +107,8 @@ class FileOptions:
             options.default_resource_type = ResourceType(data["default_resource_type"])
         if "recursive" in data:
             options.recursive = data["recursive"]
+        if "flat_scan" in data:
+            options.flat_scan = data["flat_scan"]
         return options
 
 
@@ -103,6 +116,14 @@ class FileOptions:
 class Connection:
     """Defines the connection to a database."""
 
+    __slots__ = (
+        "connection_type",
+        "catalog",
+        "connection_string",
+        "connection_options",
+        "limit_specification",
+    )
+
     connection_type: str
     catalog: Optional[str]
     connection_string: Optional[str]
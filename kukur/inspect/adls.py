@@ -3,6 +3,7 @@
 # SPDX-FileCopyrightText: 2024 Timeseer.AI
 # SPDX-License-Identifier: Apache-2.0
 
+import functools
 from pathlib import PurePath
 from typing import Generator, List, Optional, Tuple
 from urllib.parse import ParseResult
@@ -12,7 +13,7 @@ from pyarrow import fs
 
 from kukur.exceptions import MissingModuleException
 from kukur.inspect import DataOptions, FileOptions, InspectedPath, InvalidInspectURI
-from kukur.inspect.arrow import BlobResource
+from kukur.inspect.arrow import BlobResource, remove_prefix
 from kukur.inspect.arrow import inspect as inspect_blob
 
 try:
@@ -36,8 +37,7 @@ def preview(
 ) -> Optional[pa.Table]:
     """Return the first nuw_rows of the blob."""
     resource = _get_resource(blob_uri)
-    data_set = resource.get_data_set(options)
-    return data_set.head(num_rows, batch_size=num_rows, batch_readahead=1)
+    return resource.preview(num_rows, options)
 
 
 def read(
@@ -65,8 +65,14 @@ def _get_filesystem_path(blob_uri: ParseResult) -> Tuple[fs.FileSystem, PurePath
     if container_name is None:
         raise InvalidInspectURI("missing container name")
 
-    path = PurePath(container_name) / PurePath(blob_uri.path.lstrip("/"))
-    return AzureFileSystem(account_name), path
+    path = PurePath(container_name, blob_uri.path.lstrip("/"))
+    return _get_azure_filesystem(account_name), path
+
+
+@functools.lru_cache(maxsize=32)
+def _get_azure_filesystem(account_name: str) -> fs.FileSystem:
+    """Reuse filesystems, as creating one looks up credentials."""
+    return AzureFileSystem(account_name)
 
 
 def _remove_container_from_path(
@@ -79,10 +85,8 @@ def _remove_container_from_path(
     container_name = blob_uri.username
     if container_name is None:
         raise InvalidInspectURI("missing container name")
+    prefix = f"{container_name}/"
     return [
-        InspectedPath(
-            path.resource_type,
-            str(PurePath(path.path).relative_to(PurePath(container_name))),
-        )
+        InspectedPath(path.resource_type, remove_prefix(path.path, prefix))
         for path in paths
     ]
@@ -3,10 +3,16 @@
 # SPDX-FileCopyrightText: 2024 Timeseer.AI
 # SPDX-License-Identifier: Apache-2.0
 
+import functools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
 from pathlib import PurePath
-from typing import Generator, List, Optional
+from typing import Dict, Generator, Iterator, List, Optional, Tuple
 
-from pyarrow import RecordBatch, csv, fs, parquet
+from pyarrow import RecordBatch, Table, csv, fs, ipc, parquet
 from pyarrow.dataset import CsvFileFormat, Dataset, dataset
 
 from kukur.exceptions import MissingModuleException
@@ -20,19 +26,57 @@ try:
 except ImportError:
     HAS_DELTA_LAKE = False
 
+# Read a few batches and files ahead to overlap I/O with decoding,
+# while keeping memory use bounded compared to the PyArrow defaults.
+READ_BATCH_READAHEAD = 4
+READ_FRAGMENT_READAHEAD = 2
+
+# Loading a Delta Lake table reads its transaction log. Keep loaded tables for a few
+# seconds, so a preview followed by a read of the same table loads it only once.
+DELTA_DATASET_TTL_SECONDS = 10.0
+_DELTA_DATA_SETS: Dict[str, Tuple[float, Dataset]] = {}
+_DELTA_DATA_SETS_LOCK = threading.Lock()
+
+# Directories probed concurrently for a _delta_log when detecting Delta Lake tables.
+MAX_DELTA_PROBES = 16
+
 
 def inspect(
     filesystem: fs.FileSystem, path: PurePath, options: FileOptions
 ) -> List[InspectedPath]:
-    """Return the resource type of a path within a filesystem."""
-    paths = []
-    for sub_path in filesystem.get_file_info(
-        fs.FileSelector(str(path), recursive=options.recursive)
-    ):
-        resource_type = _get_resource_type(filesystem, sub_path, options)
-        if resource_type is not None:
-            paths.append(InspectedPath(resource_type, sub_path.path))
-    return paths
+    """Return the resource type of a path within a filesystem.
+
+    A flat scan detects Delta Lake tables from one recursive listing instead of
+    probing each directory. This is cheaper for containers with few files per table.
+
+    Paths with a known file extension are looked up first, as listing a single file
+    fails on some filesystems and lists a whole prefix on object stores.
+    """
+    if get_resource_type_from_extension(path.suffix.lstrip("."), None) is not None:
+        file_info = filesystem.get_file_info(str(path))
+        if file_info.type == fs.FileType.File:
+            resource_type = _get_resource_type(filesystem, file_info, options)
+            if resource_type is None:
+                return []
+            return [InspectedPath(resource_type, file_info.path)]
+    flat_scan = options.flat_scan and options.detect_delta and not options.recursive
+    file_infos = filesystem.get_file_info(
+        fs.FileSelector(str(path), recursive=options.recursive or flat_scan)
+    )
+    resource_types = _get_resource_types(
+        filesystem,
+        file_infos,
+        replace(options, recursive=True) if flat_scan else options,
+    )
+    depth = None
+    if flat_scan:
+        depth = min((file_info.path.count("/") for file_info in file_infos), default=0)
+    return [
+        InspectedPath(resource_type, file_info.path)
+        for file_info, resource_type in zip(file_infos, resource_types)
+        if resource_type is not None
+        and (depth is None or file_info.path.count("/") == depth)
+    ]
 
 
 class BlobResource:
@@ -42,37 +86,153 @@ class BlobResource:
         self.__uri = uri
         self.__fs = filesystem
         self.__path = path
+        self.__extension = path.suffix.lstrip(".")
 
     def get_data_set(self, options: Optional[DataOptions]) -> Dataset:
         """Return a DataSet for the resource."""
-        data_set = get_data_set(self.__fs, self.__path, options)
+        return self.__get_data_set(
+            _get_path_resource_type(self.__extension, options), options
+        )
+
+    def __get_data_set(
+        self, resource_type: Optional[ResourceType], options: Optional[DataOptions]
+    ) -> Dataset:
+        data_set = _get_data_set(self.__fs, self.__path, resource_type, options)
         if data_set is None:
             if not HAS_DELTA_LAKE:
                 raise MissingModuleException("deltalake")
-            data_set = DeltaTable(self.__uri).to_pyarrow_dataset()
+            data_set = _get_delta_data_set(self.__uri)
         return data_set
 
+    def preview(self, num_rows: int, options: Optional[DataOptions]) -> Table:
+        """Return the first num_rows of the resource.
+
+        Only the requested columns are read.
+        """
+        resource_type = _get_path_resource_type(self.__extension, options)
+        if resource_type == ResourceType.ARROWS:
+            return self.__preview_stream(num_rows, options)
+        data_set = self.__get_data_set(resource_type, options)
+        return data_set.head(
+            num_rows,
+            columns=_get_column_names(options),
+            batch_size=num_rows,
+            batch_readahead=1,
+            fragment_readahead=1,
+        )
+
+    def __preview_stream(self, num_rows: int, options: Optional[DataOptions]) -> Table:
+        """Read batches of an Arrow IPC stream until num_rows rows are read."""
+        batches = []
+        row_count = 0
+        with self.__fs.open_input_stream(str(self.__path)) as stream:
+            reader = ipc.open_stream(stream)
+            for batch in reader:
+                batches.append(batch.slice(0, num_rows - row_count))
+                row_count = row_count + len(batches[-1])
+                if row_count >= num_rows:
+                    break
+            table = Table.from_batches(batches, reader.schema)
+        column_names = _get_column_names(options)
+        if column_names is not None:
+            table = table.select(column_names)
+        return table
+
     def read_batches(
         self, options: Optional[DataOptions]
     ) -> Generator[RecordBatch, None, None]:
         """Iterate over all record batches in a memory-efficient way."""
-        default_resource_type = None
-        if options is not None:
-            default_resource_type = options.default_resource_type
-        if (
-            get_resource_type_from_extension(
-                self.__path.suffix.lstrip("."), default_resource_type
-            )
-            == ResourceType.PARQUET
-        ):
+        resource_type = _get_path_resource_type(self.__extension, options)
+        if resource_type == ResourceType.PARQUET:
             stream = self.__fs.open_input_file(str(self.__path))
-            rdr = parquet.ParquetFile(stream)
+            rdr = parquet.ParquetFile(stream, pre_buffer=True)
+            column_names = _get_column_names(options)
+            yield from _prefetch(
+                rdr.iter_batches(columns=column_names, **_get_batch_size(options)),
+                _get_batch_readahead(options),
+            )
+        elif resource_type == ResourceType.ARROWS:
             column_names = _get_column_names(options)
-            yield from rdr.iter_batches(columns=column_names)
+            with self.__fs.open_input_stream(str(self.__path)) as stream:
+                for batch in ipc.open_stream(stream):
+                    if column_names is None:
+                        yield batch
+                    else:
+                        yield batch.select(column_names)
+        elif resource_type == ResourceType.GPX:
+            with self.__fs.open_input_file(str(self.__path)) as readable:
+                table = parse_gpx(readable)
+            column_names = _get_column_names(options)
+            if column_names is not None:
+                table = table.select(column_names)
+            yield from table.to_batches(
+                max_chunksize=options.batch_size if options is not None else None
+            )
         else:
-            data_set = self.get_data_set(options)
+            data_set = self.__get_data_set(resource_type, options)
             column_names = _get_column_names(options)
-            yield from data_set.to_batches(columns=column_names, batch_readahead=1)
+            yield from data_set.to_batches(
+                columns=column_names,
+                batch_readahead=_get_batch_readahead(options),
+                fragment_readahead=_get_fragment_readahead(options),
+                **_get_batch_size(options),
+            )
+
+
+def _prefetch(
+    batches: Iterator[RecordBatch], readahead: int
+) -> Generator[RecordBatch, None, None]:
+    """Read up to readahead batches in the background.
+
+    The next batches are read while the caller processes the current one.
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        pending = deque(
+            executor.submit(next, batches, None) for _ in range(max(readahead, 1))
+        )
+        while (batch := pending.popleft().result()) is not None:
+            pending.append(executor.submit(next, batches, None))
+            yield batch
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _get_delta_data_set(uri: str) -> Dataset:
+    now = time.monotonic()
+    with _DELTA_DATA_SETS_LOCK:
+        cached = _DELTA_DATA_SETS.get(uri)
+    if cached is not None and now - cached[0] < DELTA_DATASET_TTL_SECONDS:
+        return cached[1]
+    data_set = DeltaTable(uri).to_pyarrow_dataset()
+    with _DELTA_DATA_SETS_LOCK:
+        for expired_uri in [
+            cached_uri
+            for cached_uri, (loaded_at, _) in _DELTA_DATA_SETS.items()
+            if now - loaded_at >= DELTA_DATASET_TTL_SECONDS
+        ]:
+            del _DELTA_DATA_SETS[expired_uri]
+        _DELTA_DATA_SETS[uri] = (now, data_set)
+    return data_set
+
+
+def _get_batch_size(options: Optional[DataOptions]) -> Dict[str, int]:
+    """Return the batch_size argument, or none to use the PyArrow default."""
+    if options is not None and options.batch_size is not None:
+        return {"batch_size": options.batch_size}
+    return {}
+
+
+def _get_batch_readahead(options: Optional[DataOptions]) -> int:
+    if options is not None and options.batch_readahead is not None:
+        return options.batch_readahead
+    return READ_BATCH_READAHEAD
+
+
+def _get_fragment_readahead(options: Optional[DataOptions]) -> int:
+    if options is not None and options.fragment_readahead is not None:
+        return options.fragment_readahead
+    return READ_FRAGMENT_READAHEAD
 
 
 def _get_column_names(options: Optional[DataOptions]) -> Optional[List[str]]:
@@ -86,19 +246,26 @@ def get_data_set(
     filesystem: fs.FileSystem, path: PurePath, options: Optional[DataOptions]
 ) -> Optional[Dataset]:
     """Return a PyArrow dataset for the resources at the given path."""
+    resource_type = _get_path_resource_type(path.suffix.lstrip("."), options)
+    return _get_data_set(filesystem, path, resource_type, options)
+
+
+def _get_path_resource_type(
+    extension: str, options: Optional[DataOptions]
+) -> Optional[ResourceType]:
     default_resource_type = None
     if options is not None:
         default_resource_type = options.default_resource_type
-    resource_type = get_resource_type_from_extension(
-        path.suffix.lstrip("."), default_resource_type
-    )
-    if resource_type in [
-        ResourceType.ARROW,
-        ResourceType.PARQUET,
-        ResourceType.CSV,
-        ResourceType.NDJSON,
-        ResourceType.ORC,
-    ]:
+    return get_resource_type_from_extension(extension, default_resource_type)
+
+
+def _get_data_set(
+    filesystem: fs.FileSystem,
+    path: PurePath,
+    resource_type: Optional[ResourceType],
+    options: Optional[DataOptions],
+) -> Optional[Dataset]:
+    if resource_type in _DATASET_RESOURCE_TYPES:
         format = resource_type.value
         if resource_type == ResourceType.CSV and options is not None:
             format = CsvFileFormat(
@@ -108,28 +275,89 @@ def get_data_set(
                 parse_options=csv.ParseOptions(delimiter=options.csv_delimiter),
             )
         return dataset(str(path), format=format, filesystem=filesystem)
+    if resource_type == ResourceType.ARROWS:
+        with filesystem.open_input_stream(str(path)) as stream:
+            return dataset(ipc.open_stream(stream).read_all())
     if resource_type == ResourceType.GPX:
         return dataset(parse_gpx(filesystem.open_input_file(str(path))))
     return None
 
 
+def _get_resource_types(
+    filesystem: fs.FileSystem, file_infos: List[fs.FileInfo], options: FileOptions
+) -> List[Optional[ResourceType]]:
+    """Return the resource type of each path, in order.
+
+    Detecting Delta Lake tables probes each directory. These probes are
+    latency-bound on remote filesystems, so they run concurrently there.
+    A recursive listing already contains every _delta_log, so it is not probed.
+    """
+    if options.detect_delta and options.recursive:
+        delta_tables = {
+            file_info.path[: -len("/_delta_log")]
+            for file_info in file_infos
+            if file_info.base_name == "_delta_log"
+        }
+        delta_tables = {
+            file_info.path
+            for file_info in file_infos
+            if file_info.path in delta_tables and _may_be_delta(file_info)
+        }
+        listed_options = replace(options, detect_delta=False)
+        return [
+            (
+                ResourceType.DELTA
+                if file_info.path in delta_tables
+                else _get_resource_type(filesystem, file_info, listed_options)
+            )
+            for file_info in file_infos
+        ]
+    probe_count = sum(1 for file_info in file_infos if _may_be_delta(file_info))
+    if (
+        not options.detect_delta
+        or probe_count <= 1
+        or isinstance(filesystem, fs.LocalFileSystem)
+    ):
+        return [
+            _get_resource_type(filesystem, file_info, options)
+            for file_info in file_infos
+        ]
+    with ThreadPoolExecutor(max_workers=min(probe_count, MAX_DELTA_PROBES)) as executor:
+        return list(
+            executor.map(
+                functools.partial(_get_resource_type, filesystem, options=options),
+                file_infos,
+            )
+        )
+
+
 def _get_resource_type(
     filesystem: fs.FileSystem, file_info: fs.FileInfo, options: FileOptions
 ) -> Optional[ResourceType]:
     if file_info.type == fs.FileType.Directory:
-        if options.detect_delta:
-            for file_inside in filesystem.get_file_info(
-                fs.FileSelector(file_info.path)
-            ):
-                if file_inside.base_name == "_delta_log":
-                    return ResourceType.DELTA
+        if options.detect_delta and _may_be_delta(file_info):
+            delta_log = filesystem.get_file_info(f"{file_info.path}/_delta_log")
+            if delta_log.type != fs.FileType.NotFound:
+                return ResourceType.DELTA
         return ResourceType.DIRECTORY
     return get_resource_type_from_extension(
         file_info.extension, options.default_resource_type
     )
 
 
-def get_resource_type_from_extension(  # noqa: PLR0911
+def _may_be_delta(file_info: fs.FileInfo) -> bool:
+    """Return False for Hive-style partitions (key=value), which are not Delta tables."""
+    return file_info.type == fs.FileType.Directory and "=" not in file_info.base_name
+
+
+def remove_prefix(path: str, prefix: str) -> str:
+    """Return the path relative to the given prefix."""
+    if path.startswith(prefix):
+        return path[len(prefix) :]
+    return str(PurePath(path).relative_to(PurePath(prefix)))
+
+
+def get_resource_type_from_extension(
     extension: str, default_type: Optional[ResourceType]
 ) -> Optional[ResourceType]:
     """Return the resource type based on a file extension.
@@ -139,18 +367,29 @@ def get_resource_type_from_extension(  # noqa: PLR0911
     """
     if extension == "" and default_type is not None:
         return default_type
-    if extension == "parquet":
-        return ResourceType.PARQUET
-    if extension in ["arrow", "feather"]:
-        return ResourceType.ARROW
-    if extension in ["arrows"]:
-        return ResourceType.ARROWS
-    if extension in ["csv", "txt"]:
-        return ResourceType.CSV
-    if extension in ["gpx"]:
-        return ResourceType.GPX
-    if extension in ["ndjson", "json"]:
-        return ResourceType.NDJSON
-    if extension in ["orc"]:
-        return ResourceType.ORC
-    return None
+    return _EXTENSION_RESOURCE_TYPES.get(extension)
+
+
+_EXTENSION_RESOURCE_TYPES = {
+    "parquet": ResourceType.PARQUET,
+    "arrow": ResourceType.ARROW,
+    "feather": ResourceType.ARROW,
+    "arrows": ResourceType.ARROWS,
+    "csv": ResourceType.CSV,
+    "txt": ResourceType.CSV,
+    "gpx": ResourceType.GPX,
+    "ndjson": ResourceType.NDJSON,
+    "json": ResourceType.NDJSON,
+    "orc": ResourceType.ORC,
+}
+
+# Resource types read directly by pyarrow.dataset; their values are format names.
+_DATASET_RESOURCE_TYPES = frozenset(
+    [
+        ResourceType.ARROW,
+        ResourceType.PARQUET,
+        ResourceType.CSV,
+        ResourceType.NDJSON,
+        ResourceType.ORC,
+    ]
+)
@@ -31,10 +31,9 @@ def preview_filesystem(
     path: Path, num_rows: int = 5000, options: Optional[DataOptions] = None
 ) -> Optional[pa.Table]:
     """Preview a data file at the specified filesystem location."""
-    local = fs.LocalFileSystem()
+    local = fs.LocalFileSystem(use_mmap=True)
     resource = BlobResource(str(path), local, path)
-    data_set = resource.get_data_set(options)
-    return data_set.head(num_rows, batch_size=num_rows, batch_readahead=1)
+    return resource.preview(num_rows, options)
 
 
 def read_filesystem(
@@ -43,7 +42,8 @@ def read_filesystem(
     """Read path as a series of record batches.
 
     Optionally filters the columns returned.
+    Files are memory-mapped instead of copied into read buffers.
     """
-    local = fs.LocalFileSystem()
+    local = fs.LocalFileSystem(use_mmap=True)
     resource = BlobResource(str(path), local, path)
     yield from resource.read_batches(options)
@@ -3,7 +3,8 @@
 # SPDX-FileCopyrightText: 2024 Timeseer.AI
 # SPDX-License-Identifier: Apache-2.0
 
-from collections import defaultdict
+import datetime
+from decimal import Decimal
 from typing import Generator, List, Optional
 
 import pyarrow as pa
@@ -16,6 +17,13 @@ from kukur.inspect import (
     InvalidInspectURI,
     ResourceType,
 )
+from kukur.inspect.sql import (
+    format_column_names,
+    get_column_names,
+    get_decimal_type,
+    read_batches,
+    to_record_batch,
+)
 
 try:
     import pyodbc
@@ -24,6 +32,19 @@ try:
 except ImportError:
     HAS_ODBC = False
 
+# Arrow types of ODBC columns, by the Python type pyodbc returns for them.
+_ODBC_TYPES = {
+    bool: pa.bool_(),
+    int: pa.int64(),
+    float: pa.float64(),
+    str: pa.string(),
+    bytes: pa.binary(),
+    bytearray: pa.binary(),
+    datetime.date: pa.date32(),
+    datetime.datetime: pa.timestamp("us"),
+    datetime.time: pa.time64("us"),
+}
+
 
 def inspect_odbc_database(
     config: Connection, path: Optional[str] = None
@@ -78,39 +99,27 @@ def preview_odbc_database(
     if config.catalog is not None:
         catalog = f"{_escape(config.catalog)}."
 
-    if options is not None and options.column_names is not None:
-        column_names = options.column_names
-    else:
-        cursor.execute(
-            f"""
-            select column_name from {catalog}information_schema.columns
-            where table_schema = ?
-                and table_name = ?
-            """,
-            split_path,
-        )
-        column_names = [name for name, in cursor]
-
-    columns = [_escape(column_name) for column_name in column_names]
+    column_names = get_column_names(options)
+    columns = format_column_names(column_names, _escape)
     if config.limit_specification == "limit":
         query = f"""
-            select {', '.join(columns)}
+            select {columns}
             from {catalog}{_escape(split_path[0])}.{_escape(split_path[1])} limit ?
         """
         cursor.execute(query, [num_rows])
     else:
         query = f"""
-            select top {num_rows} {', '.join(columns)}
+            select top {num_rows} {columns}
             from {catalog}{_escape(split_path[0])}.{_escape(split_path[1])}
         """
         cursor.execute(query)
+    if column_names is None:
+        column_names = [column[0] for column in cursor.description]
+    column_types = _get_column_types(cursor.description)
 
-    results = defaultdict(list)
-    for row in cursor:
-        for index in range(len(row)):
-            results[column_names[index]].append(row[index])
+    batch = to_record_batch(cursor.fetchall(), column_names, column_types)
     connection.close()
-    return pa.Table.from_pydict(results)
+    return pa.Table.from_batches([batch])
 
 
 def read_odbc_database(
@@ -127,31 +136,18 @@ def read_odbc_database(
     if config.catalog is not None:
         catalog = f"{_escape(config.catalog)}."
 
-    if options is not None and options.column_names is not None:
-        column_names = options.column_names
-    else:
-        cursor.execute(
-            f"""
-            select column_name from {catalog}information_schema.columns
-            where table_schema = ?
-                and table_name = ?
-            """,
-            split_path,
-        )
-        column_names = [name for name, in cursor]
-
-    columns = [_escape(column_name) for column_name in column_names]
+    column_names = get_column_names(options)
+    columns = format_column_names(column_names, _escape)
     query = f"""
-        select {', '.join(columns)}
+        select {columns}
         from {catalog}{_escape(split_path[0])}.{_escape(split_path[1])}
     """
 
     cursor.execute(query)
-    results = defaultdict(list)
-    for row in cursor:
-        for index in range(len(row)):
-            results[column_names[index]].append(row[index])
-    yield pa.RecordBatch.from_pydict(results)
+    if column_names is None:
+        column_names = [column[0] for column in cursor.description]
+    column_types = _get_column_types(cursor.description)
+    yield from read_batches(cursor, column_names, column_types)
     connection.close()
 
 
@@ -164,6 +160,21 @@ def _get_connection(config: Connection):
     return pyodbc.connect(config.connection_string, autocommit=True)
 
 
+def _get_column_types(description) -> List[Optional[pa.DataType]]:
+    """Return the Arrow type of each column in a cursor description.
+
+    The type is None when it is unknown and should be inferred from the values.
+    """
+    column_types = []
+    for column in description:
+        type_code, precision, scale = column[1], column[4], column[5]
+        if type_code is Decimal:
+            column_types.append(get_decimal_type(precision, scale))
+        else:
+            column_types.append(_ODBC_TYPES.get(type_code))
+    return column_types
+
+
 def _escape(context: Optional[str]) -> str:
     if context is None:
         context = "value"
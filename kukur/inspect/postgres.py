@@ -3,7 +3,6 @@
 # SPDX-FileCopyrightText: 2024 Timeseer.AI
 # SPDX-License-Identifier: Apache-2.0
 
-from collections import defaultdict
 from typing import Generator, List, Optional
 
 from kukur.exceptions import InvalidSourceException, MissingModuleException
@@ -31,6 +30,33 @@ from kukur.inspect import (
     InvalidInspectURI,
     ResourceType,
 )
+from kukur.inspect.sql import (
+    format_column_names,
+    get_column_names,
+    get_decimal_type,
+    read_batches,
+    to_record_batch,
+)
+
+# Arrow types of postgres columns, by type OID.
+_POSTGRES_TYPES = {
+    16: pa.bool_(),
+    17: pa.binary(),
+    19: pa.string(),
+    20: pa.int64(),
+    21: pa.int64(),
+    23: pa.int64(),
+    25: pa.string(),
+    700: pa.float64(),
+    701: pa.float64(),
+    1042: pa.string(),
+    1043: pa.string(),
+    1082: pa.date32(),
+    1083: pa.time64("us"),
+    1114: pa.timestamp("us"),
+    1184: pa.timestamp("us", tz="UTC"),
+}
+_NUMERIC_OID = 1700
 
 
 class PostgresPg8000:
@@ -81,29 +107,18 @@ class PostgresPg8000:
         split_path = path.split("/")
         if len(split_path) == 1:
             InvalidInspectURI("No schema or table provided.")
-        if options is not None and options.column_names is not None:
-            column_names = options.column_names
-        else:
-            cursor.execute(
-                """
-                select column_name from information_schema.columns
-                where table_schema = %s
-                    and table_name = %s
-                """,
-                split_path,
-            )
-            column_names = [name for name, in cursor]
-        columns = [_escape(column) for column in column_names]
+        column_names = get_column_names(options)
+        columns = format_column_names(column_names, _escape)
         params = [num_rows]
-        query = f"select {', '.join(columns)} from {_escape(split_path[0])}.{_escape(split_path[1])} limit %s"
+        query = f"select {columns} from {_escape(split_path[0])}.{_escape(split_path[1])} limit %s"
 
         cursor.execute(query, params)
+        if column_names is None:
+            column_names = [column[0] for column in cursor.description]
+        column_types = _get_column_types(cursor.description)
 
-        results = defaultdict(list)
-        for row in cursor:
-            for index in range(len(row)):
-                results[column_names[index]].append(row[index])
-        return pa.Table.from_pydict(results)
+        batch = to_record_batch(cursor.fetchall(), column_names, column_types)
+        return pa.Table.from_batches([batch])
 
     def read_database(
         self, path: str, options: Optional[DataOptions] = None
@@ -114,26 +129,16 @@ class PostgresPg8000:
         split_path = path.split("/")
         if len(split_path) == 1:
             raise InvalidInspectURI("No schema or table provided.")
-        if options is not None and options.column_names is not None:
-            column_names = options.column_names
-        else:
-            cursor.execute(
-                """
-                select column_name from information_schema.columns
-                where table_schema = %s
-                    and table_name = %s
-                """,
-                split_path,
-            )
-            column_names = [name for name, in cursor]
-        columns = [_escape(column) for column in column_names]
-        query = f"select {', '.join(columns)} from {_escape(split_path[0])}.{_escape(split_path[1])}"
+        column_names = get_column_names(options)
+        columns = format_column_names(column_names, _escape)
+        query = (
+            f"select {columns} from {_escape(split_path[0])}.{_escape(split_path[1])}"
+        )
         cursor.execute(query)
-        results = defaultdict(list)
-        for row in cursor:
-            for index in range(len(row)):
-                results[column_names[index]].append(row[index])
-        yield pa.RecordBatch.from_pydict(results)
+        if column_names is None:
+            column_names = [column[0] for column in cursor.description]
+        column_types = _get_column_types(cursor.description)
+        yield from read_batches(cursor, column_names, column_types)
 
 
 class PostgresPsycopg:
@@ -185,71 +190,43 @@ class PostgresPsycopg:
         if len(split_path) == 1:
             raise InvalidInspectURI("No schema or table provided.")
 
-        if options is not None and options.column_names is not None:
-            column_names = options.column_names
-        else:
-            cursor.execute(
-                """
-                select column_name from information_schema.columns
-                where table_schema = %s
-                    and table_name = %s
-                """,
-                split_path,
-            )
-            column_names = [name for name, in cursor]
-
+        column_names = get_column_names(options)
         query = psycopg.sql.SQL(
             "select {column_names} from {schema}.{table} limit %s"
         ).format(
-            column_names=psycopg.sql.SQL(",").join(
-                [psycopg.sql.Identifier(column_name) for column_name in column_names]
-            ),
+            column_names=_compose_column_names(column_names),
             schema=psycopg.sql.Identifier(split_path[0]),
             table=psycopg.sql.Identifier(split_path[1]),
         )
 
         cursor.execute(query, [num_rows])
-        results = defaultdict(list)
-        for row in cursor:
-            for index in range(len(row)):
-                results[column_names[index]].append(row[index])
-        return pa.Table.from_pydict(results)
+        if column_names is None:
+            column_names = [column.name for column in cursor.description]
+        column_types = _get_column_types(cursor.description)
+        batch = to_record_batch(cursor.fetchall(), column_names, column_types)
+        return pa.Table.from_batches([batch])
 
     def read_database(
         self, path: str, options: Optional[DataOptions] = None
     ) -> Generator[pa.RecordBatch, None, None]:
         """Iterate over the RecordBatches at the given Connection."""
         connection = self._connect()
-        cursor = connection.cursor()
+        # A server-side cursor sends rows as they are fetched instead of all at once.
+        cursor = connection.cursor(name="kukur_read")
         split_path = path.split("/")
         if len(split_path) == 1:
             raise InvalidInspectURI("No schema or table provided.")
-        if options is not None and options.column_names is not None:
-            column_names = options.column_names
-        else:
-            cursor.execute(
-                """
-                select column_name from information_schema.columns
-                    where table_schema = %s
-                    and table_name = %s
-                """,
-                split_path,
-            )
-            column_names = [name for name, in cursor]
-
+        column_names = get_column_names(options)
         query = psycopg.sql.SQL("select {column_names} from {schema}.{table}").format(
-            column_names=psycopg.sql.SQL(",").join(
-                [psycopg.sql.Identifier(column_name) for column_name in column_names]
-            ),
+            column_names=_compose_column_names(column_names),
             schema=psycopg.sql.Identifier(split_path[0]),
             table=psycopg.sql.Identifier(split_path[1]),
         )
         cursor.execute(query)
-        results = defaultdict(list)
-        for row in cursor:
-            for index in range(len(row)):
-                results[column_names[index]].append(row[index])
-        yield pa.RecordBatch.from_pydict(results)
+        if column_names is None:
+            column_names = [column.name for column in cursor.description]
+        column_types = _get_column_types(cursor.description)
+        yield from read_batches(cursor, column_names, column_types)
 
 
 def get_connection(config: Connection):
@@ -265,6 +242,29 @@ def get_connection(config: Connection):
     raise InvalidSourceException("Missing `connection_options` or `connection_string`")
 
 
+def _get_column_types(description) -> List[Optional[pa.DataType]]:
+    """Return the Arrow type of each column in a cursor description.
+
+    The type is None when it is unknown and should be inferred from the values.
+    """
+    column_types = []
+    for column in description:
+        type_code, precision, scale = column[1], column[4], column[5]
+        if type_code == _NUMERIC_OID:
+            column_types.append(get_decimal_type(precision, scale))
+        else:
+            column_types.append(_POSTGRES_TYPES.get(type_code))
+    return column_types
+
+
+def _compose_column_names(column_names: Optional[List[str]]):
+    if column_names is None:
+        return psycopg.sql.SQL("*")
+    return psycopg.sql.SQL(",").join(
+        [psycopg.sql.Identifier(column_name) for column_name in column_names]
+    )
+
+
 def _escape(context: Optional[str]) -> str:
     if context is None:
         context = "value"
@@ -11,7 +11,7 @@ import pyarrow as pa
 from pyarrow.fs import S3FileSystem, resolve_s3_region
 
 from kukur.inspect import DataOptions, FileOptions, InspectedPath, InvalidInspectURI
-from kukur.inspect.arrow import BlobResource
+from kukur.inspect.arrow import BlobResource, remove_prefix
 from kukur.inspect.arrow import inspect as inspect_s3
 
 
@@ -36,8 +36,7 @@ def preview(
 ) -> Optional[pa.Table]:
     """Return the first nuw_rows of the blob."""
     resource = _get_resource(blob_uri)
-    data_set = resource.get_data_set(options)
-    return data_set.head(num_rows, batch_size=num_rows, batch_readahead=1)
+    return resource.preview(num_rows, options)
 
 
 def read(
@@ -58,7 +57,7 @@ def _get_blob_path(blob_uri: ParseResult) -> PurePath:
     bucket_name = blob_uri.netloc
     if bucket_name is None:
         raise InvalidInspectURI("missing bucket name")
-    return PurePath(bucket_name) / PurePath(blob_uri.path.lstrip("/"))
+    return PurePath(bucket_name, blob_uri.path.lstrip("/"))
 
 
 def _remove_bucket_from_path(
@@ -71,10 +70,8 @@ def _remove_bucket_from_path(
     bucket_name = blob_uri.hostname
     if bucket_name is None:
         raise InvalidInspectURI("missing bucket name")
+    prefix = f"{bucket_name}/"
     return [
-        InspectedPath(
-            path.resource_type,
-            str(PurePath(path.path).relative_to(PurePath(bucket_name))),
-        )
+        InspectedPath(path.resource_type, remove_prefix(path.path, prefix))
         for path in paths
     ]
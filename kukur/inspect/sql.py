@@ -0,0 +1,109 @@
+"""Helpers shared by the database inspectors."""
+
+# SPDX-FileCopyrightText: 2024 Timeseer.AI
+# SPDX-License-Identifier: Apache-2.0
+
+from typing import Callable, Generator, List, Optional, Sequence
+
+import pyarrow as pa
+
+from kukur.exceptions import InvalidDataError
+from kukur.inspect import DataOptions
+
+# Rows fetched from the database per RecordBatch when reading a table.
+READ_BATCH_ROWS = 8192
+
+_DECIMAL128_MAX_PRECISION = 38
+_DECIMAL256_MAX_PRECISION = 76
+
+
+def get_column_names(options: Optional[DataOptions]) -> Optional[List[str]]:
+    """Return the requested columns, or None to select all columns."""
+    if options is None:
+        return None
+    return options.column_names
+
+
+def format_column_names(
+    column_names: Optional[List[str]], escape: Callable[[str], str]
+) -> str:
+    """Return the select list for the requested columns."""
+    if column_names is None:
+        return "*"
+    return ", ".join(escape(column_name) for column_name in column_names)
+
+
+def read_batches(
+    cursor, column_names: List[str], column_types: List[Optional[pa.DataType]]
+) -> Generator[pa.RecordBatch, None, None]:
+    """Fetch rows in RecordBatches of at most READ_BATCH_ROWS rows.
+
+    At least one, possibly empty, RecordBatch is returned.
+    All batches share the schema of the first one, see to_record_batch.
+    A column that is unknown and only NULL in the first batch stays null-typed.
+    """
+    rows = cursor.fetchmany(READ_BATCH_ROWS)
+    while True:
+        batch = to_record_batch(rows, column_names, column_types)
+        column_types = batch.schema.types
+        yield batch
+        rows = cursor.fetchmany(READ_BATCH_ROWS)
+        if not rows:
+            break
+
+
+def to_record_batch(
+    rows: List[Sequence],
+    column_names: List[str],
+    column_types: List[Optional[pa.DataType]],
+) -> pa.RecordBatch:
+    """Transpose rows to a RecordBatch.
+
+    Columns without a type take the type inferred from their values.
+    Decimals are widened to the maximum precision, keeping the inferred scale.
+    Values are cast to the column type, raising InvalidDataError when that loses data.
+    """
+    columns = zip(*rows) if rows else [()] * len(column_names)
+    arrays = [
+        _to_array(column, column_name, column_type)
+        for column, column_name, column_type in zip(columns, column_names, column_types)
+    ]
+    return pa.RecordBatch.from_arrays(arrays, names=column_names)
+
+
+def _to_array(
+    values: Sequence, column_name: str, column_type: Optional[pa.DataType]
+) -> pa.Array:
+    # Values are converted before casting, as pa.array truncates floats to integer types.
+    array = pa.array(values)
+    if column_type is None:
+        column_type = _widen_decimal(array.type)
+    if array.type == column_type:
+        return array
+    try:
+        return array.cast(column_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as err:
+        raise InvalidDataError(
+            f"column {column_name} of type {column_type} contains {array.type}"
+        ) from err
+
+
+def _widen_decimal(data_type: pa.DataType) -> pa.DataType:
+    if pa.types.is_decimal128(data_type):
+        return pa.decimal128(_DECIMAL128_MAX_PRECISION, data_type.scale)
+    if pa.types.is_decimal256(data_type):
+        return pa.decimal256(_DECIMAL256_MAX_PRECISION, data_type.scale)
+    return data_type
+
+
+def get_decimal_type(
+    precision: Optional[int], scale: Optional[int]
+) -> Optional[pa.DataType]:
+    """Return the Arrow type of a decimal column, or None when it is unconstrained."""
+    if precision is None or scale is None or precision <= 0:
+        return None
+    if precision <= _DECIMAL128_MAX_PRECISION:
+        return pa.decimal128(precision, scale)
+    if precision <= _DECIMAL256_MAX_PRECISION:
+        return pa.decimal256(precision, scale)
+    return None
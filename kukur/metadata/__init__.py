@@ -7,7 +7,7 @@ They have been defined here. Users of Kukur can define their own metadata fields
 # SPDX-FileCopyrightText: 2021 Timeseer.AI
 # SPDX-License-Identifier: Apache-2.0
 
-from typing import Any, Dict, Generator, List, Optional, Tuple, TypeVar, Union
+from typing import Any, Dict, Generator, List, Optional, Tuple, TypeVar
 
 from kukur.base import SeriesSelector
 
@@ -23,8 +23,19 @@ class MetadataFields:
     Alternatively, untyped methods that accept fields by name are also available.
     """
 
-    _fields: List[MetadataField] = []
-    __values: Dict[Union[str, MetadataField], Any]
+    __slots__ = (
+        "_fields",
+        "_field_index",
+        "_field_index_size",
+        "__values",
+        "__custom_values",
+    )
+
+    _fields: List[MetadataField]
+    _field_index: Dict[str, MetadataField]
+    _field_index_size: int
+    __values: Dict[MetadataField, Any]
+    __custom_values: Dict[str, Any]
 
     def __init__(
         self,
@@ -32,7 +43,10 @@ class MetadataFields:
         values: Optional[Dict[MetadataField, Any]] = None,
     ):
         self._fields = fields
+        self._field_index = self._get_field_index(fields)
+        self._field_index_size = len(fields)
         self.__values = {k: k.default() for k in self._fields}
+        self.__custom_values = {}
         if values is not None:
             for field, value in values.items():
                 self.__values[field] = value
@@ -45,21 +59,17 @@ class MetadataFields:
     def iter_names(self) -> Generator[Tuple[str, Any], None, None]:
         """Iterate over all metadata fields (typed and untyped) and return their names and values."""
         for field, value in self.__values.items():
-            if isinstance(field, MetadataField):
-                yield (field.name(), field.calculated_value(self, value))
-            else:
-                yield (field, value)
+            yield (field.name(), field.calculated_value(self, value))
+        yield from self.__custom_values.items()
 
     def iter_serialized(self) -> Generator[Tuple[str, Any], None, None]:
         """Iterate over all metadata fields, but use the human readable names and serialized values."""
         for field, value in self.__values.items():
-            if isinstance(field, MetadataField):
-                yield (
-                    field.name(),
-                    field.serialize(field.calculated_value(self, value)),
-                )
-            else:
-                yield (field, value)
+            yield (
+                field.name(),
+                field.serialize(field.calculated_value(self, value)),
+            )
+        yield from self.__custom_values.items()
 
     def find_field(self, field_name: str) -> MetadataField:
         """Return the MetadataField with the given name.
@@ -81,7 +91,7 @@ class MetadataFields:
         """Set the field of the given name to the corresponding value."""
         field = self._find_field(field_name)
         if field is None:
-            self.__values[field_name] = value
+            self.__custom_values[field_name] = value
         else:
             self.__values[field] = value
 
@@ -94,7 +104,7 @@ class MetadataFields:
         if field is not None:
             self.__values[field] = field.deserialize(value)
         else:
-            self.__values[field_name] = value
+            self.__custom_values[field_name] = value
 
     def get_field(self, field: MetadataField[T]) -> T:
         """Return the value of the given field."""
@@ -109,32 +119,36 @@ class MetadataFields:
         """
         field = self._find_field(field_name)
         if field is None:
-            if field_name not in self.__values:
-                return None
-            return self.__values[field_name]
+            return self.__custom_values.get(field_name)
         return self.get_field(field)
 
     def to_data(self) -> Dict[str, Any]:
         """Convert the metadata to a Dictionary with camelcase keys as expected in JSON."""
-        data = {}
-        for field, value in self.__values.items():
-            if isinstance(field, MetadataField):
-                data[field.serialized_name()] = field.serialize(value)
-            else:
-                data[field] = value
+        data = {
+            field.serialized_name(): field.serialize(value)
+            for field, value in self.__values.items()
+        }
+        data.update(self.__custom_values)
         return data
 
     def _find_field(self, field_name: str) -> Optional[MetadataField]:
-        for field in self._fields:
-            if field.name() == field_name or field.serialized_name() == field_name:
-                return field
-        return None
+        if self._field_index_size != len(self._fields):
+            # Fields were registered after this instance was created.
+            self._field_index = self._get_field_index(self._fields)
+            self._field_index_size = len(self._fields)
+        return self._field_index.get(field_name)
+
+    def _get_field_index(self, fields: List[MetadataField]) -> Dict[str, MetadataField]:
+        return _index_fields(fields)
 
 
 class Metadata(MetadataFields):
     """Metadata fields for one time series."""
 
-    _fields: List[MetadataField] = []
+    __slots__ = ("series",)
+
+    _registered_fields: List[MetadataField] = []
+    _registered_field_index: Dict[str, MetadataField] = {}
     series: SeriesSelector
 
     @classmethod
@@ -146,9 +160,12 @@ class Metadata(MetadataFields):
         Optionally insert it right after the given field in the field ordering.
         """
         if after_field is not None:
-            cls._fields.insert(cls._fields.index(after_field) + 1, field)
+            cls._registered_fields.insert(
+                cls._registered_fields.index(after_field) + 1, field
+            )
         else:
-            cls._fields.append(field)
+            cls._registered_fields.append(field)
+        cls._registered_field_index = _index_fields(cls._registered_fields)
 
     @classmethod
     def from_data(
@@ -174,7 +191,7 @@ class Metadata(MetadataFields):
         series: SeriesSelector,
         values: Optional[Dict[MetadataField, Any]] = None,
     ):
-        super().__init__(self._fields, values)
+        super().__init__(self._registered_fields, values)
         self.series = series
 
     def __repr__(self) -> str:
@@ -187,5 +204,22 @@ class Metadata(MetadataFields):
         data["series"] = self.series.to_data()
         return data
 
+    def _get_field_index(self, fields: List[MetadataField]) -> Dict[str, MetadataField]:
+        if fields is self._registered_fields:
+            return self._registered_field_index
+        return super()._get_field_index(fields)
+
+
+def _index_fields(fields: List[MetadataField]) -> Dict[str, MetadataField]:
+    """Map the human readable and the serialized name of each field to the field.
+
+    Earlier fields take precedence when names collide.
+    """
+    index: Dict[str, MetadataField] = {}
+    for field in fields:
+        index.setdefault(field.name(), field)
+        index.setdefault(field.serialized_name(), field)
+    return index
+
 
 register_default_fields(Metadata)
@@ -166,6 +166,12 @@ AccuracyPercentage = MetadataField[Optional[float]](
 )
 
 
+_INTERPOLATION_TYPES = {
+    interpolation_type.value: interpolation_type
+    for interpolation_type in KukurInterpolationType
+}
+
+
 def _interpolation_type_to_json(
     interpolation_type: Optional[KukurInterpolationType],
 ) -> Optional[str]:
@@ -179,7 +185,10 @@ def _interpolation_type_from_json(
 ) -> Optional[KukurInterpolationType]:
     if interpolation_type is None:
         return None
-    return KukurInterpolationType(interpolation_type)
+    try:
+        return _INTERPOLATION_TYPES[interpolation_type]
+    except (KeyError, TypeError):
+        return KukurInterpolationType(interpolation_type)
 
 
 InterpolationType = MetadataField[Optional[KukurInterpolationType]](
@@ -191,6 +200,9 @@ InterpolationType = MetadataField[Optional[KukurInterpolationType]](
 )
 
 
+_DATA_TYPES = {data_type.value: data_type for data_type in KukurDataType}
+
+
 def _data_type_to_json(data_type: Optional[KukurDataType]) -> Optional[str]:
     if data_type is None:
         return None
@@ -200,7 +212,10 @@ def _data_type_to_json(data_type: Optional[KukurDataType]) -> Optional[str]:
 def _data_type_from_json(data_type: Optional[str]) -> Optional[KukurDataType]:
     if data_type is None:
         return None
-    return KukurDataType(data_type)
+    try:
+        return _DATA_TYPES[data_type]
+    except (KeyError, TypeError):
+        return KukurDataType(data_type)
 
 
 DataType = MetadataField[Optional[KukurDataType]](
@@ -222,7 +237,7 @@ def _dictionary_to_json(
 ) -> Optional[List[Tuple[int, str]]]:
     if dictionary is None:
         return None
-    return list(dictionary.mapping.items())
+    return dictionary.to_data()
 
 
 def _dictionary_from_json(
@@ -76,12 +76,10 @@ class InfluxSource:
     def search(self, selector: SeriesSearch) -> Generator[Metadata, None, None]:
         """Search for series matching the given selector."""
         measurement = None
-        if "series name" in selector.tags:
-            measurement = selector.tags["series name"]
-            del selector.tags["series name"]
-        many_series = self.__client.get_list_series(
-            measurement=measurement, tags=selector.tags
-        )
+        tags = dict(selector.tags)
+        if "series name" in tags:
+            measurement = tags.pop("series name")
+        many_series = self.__client.get_list_series(measurement=measurement, tags=tags)
         fields = self.__client.query("SHOW FIELD KEYS")
         for series in many_series:
             measurement, tags = _parse_influx_series(series)
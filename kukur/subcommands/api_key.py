@@ -6,8 +6,10 @@
 import csv
 import sys
 from argparse import ArgumentParser, Namespace
+from typing import TYPE_CHECKING
 
-from kukur.app import Kukur
+if TYPE_CHECKING:
+    from kukur.app import Kukur
 
 
 def define_arguments(parser: ArgumentParser):
@@ -27,7 +29,7 @@ def define_arguments(parser: ArgumentParser):
     )
 
 
-def run(kukur_app: Kukur, args: Namespace):
+def run(kukur_app: "Kukur", args: Namespace):
     """Run the selected API key subcommand."""
     if args.api_key_action not in ["create", "revoke", "list"]:
         return
@@ -41,5 +43,4 @@ def run(kukur_app: Kukur, args: Namespace):
         kukur_app.get_api_keys().revoke(args.name)
     elif args.api_key_action == "list":
         api_keys = kukur_app.get_api_keys().list()
-        for key in api_keys:
-            writer.writerow((key.name, key.creation_date.isoformat()))
+        writer.writerows((key.name, key.creation_date.isoformat()) for key in api_keys)
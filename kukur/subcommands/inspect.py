@@ -9,9 +9,6 @@ import time
 from argparse import ArgumentParser, Namespace
 from pathlib import Path
 
-from kukur.inspect.blob import inspect_blob, preview_blob
-from kukur.inspect.filesystem import inspect_filesystem, preview_filesystem
-
 
 def define_arguments(parser: ArgumentParser):
     """Create a subcommand for each resource supported by inspect."""
@@ -44,6 +41,12 @@ def define_arguments(parser: ArgumentParser):
 
 def run(args: Namespace):
     """Inspect a data source."""
+    from kukur.inspect.blob import inspect_blob, preview_blob
+    from kukur.inspect.filesystem import (
+        inspect_filesystem,
+        preview_filesystem,
+    )
+
     paths = None
     preview = None
     if args.inspect_action == "blob":
@@ -59,8 +62,7 @@ def run(args: Namespace):
 
     if paths is not None:
         writer = csv.writer(sys.stdout)
-        for path in paths:
-            writer.writerow([path.resource_type.value, path.path])
+        writer.writerows([path.resource_type.value, path.path] for path in paths)
     if preview is not None:
         print(preview)  # noqa: T201
         time.sleep(1)  # otherwise pyarrow datasets segfault
@@ -6,11 +6,10 @@
 import csv
 import sys
 from argparse import ArgumentParser, Namespace
+from typing import TYPE_CHECKING
 
-from dateutil.parser import parse as parse_date
-
-import kukur.source.test as test_source
-from kukur.app import Kukur
+if TYPE_CHECKING:
+    from kukur.app import Kukur
 
 
 def define_arguments(parser: ArgumentParser):
@@ -106,41 +105,43 @@ def define_arguments(parser: ArgumentParser):
     )
 
 
-def run(kukur_app: Kukur, args: Namespace):
+def run(kukur_app: "Kukur", args: Namespace):
     """Run the selected test subcommand."""
     if args.test_action not in ["search", "metadata", "data", "plot"]:
         return
 
+    from dateutil.parser import parse as parse_date
+
+    import kukur.source.test as test_source
+
     writer = csv.writer(sys.stdout)
 
     source_name: str = args.source
 
     series_name: str
     if args.test_action == "search":
-        for row in test_source.search(kukur_app, source_name):
-            writer.writerow(row)
+        writer.writerows(test_source.search(kukur_app, source_name))
     elif args.test_action == "metadata":
         series_name = args.name
-        for row in test_source.metadata(kukur_app, source_name, series_name):
-            writer.writerow(row)
+        writer.writerows(test_source.metadata(kukur_app, source_name, series_name))
     elif args.test_action == "data":
         series_name = args.name
         start_date = parse_date(args.start)
         end_date = parse_date(args.end)
-        for row in test_source.data(
-            kukur_app, source_name, series_name, start_date, end_date
-        ):
-            writer.writerow(row)
+        writer.writerows(
+            test_source.data(kukur_app, source_name, series_name, start_date, end_date)
+        )
     elif args.test_action == "plot":
         series_name = args.name
         start_date = parse_date(args.start)
         end_date = parse_date(args.end)
-        for row in test_source.plot(
-            kukur_app,
-            source_name,
-            series_name,
-            start_date,
-            end_date,
-            args.interval_count,
-        ):
-            writer.writerow(row)
+        writer.writerows(
+            test_source.plot(
+                kukur_app,
+                source_name,
+                series_name,
+                start_date,
+                end_date,
+                args.interval_count,
+            )
+        )
@@ -0,0 +1,22 @@
+"""Test the Inspect functions for Azure Data Lake Storage."""
+
+# SPDX-FileCopyrightText: 2025 Timeseer.AI
+# SPDX-License-Identifier: Apache-2.0
+
+from urllib.parse import urlparse
+
+from kukur.inspect import InspectedPath, ResourceType
+from kukur.inspect.adls import _remove_container_from_path
+
+
+def test_remove_container_from_path() -> None:
+    blob_uri = urlparse("abfss://container@account.dfs.core.windows.net/dir")
+    paths = [
+        InspectedPath(ResourceType.DIRECTORY, "container/dir/sub"),
+        InspectedPath(ResourceType.PARQUET, "container/dir/data.parquet"),
+    ]
+    results = _remove_container_from_path(blob_uri, paths)
+    assert results == [
+        InspectedPath(ResourceType.DIRECTORY, "dir/sub"),
+        InspectedPath(ResourceType.PARQUET, "dir/data.parquet"),
+    ]
@@ -3,9 +3,14 @@
 # SPDX-FileCopyrightText: 2024 Timeseer.AI
 # SPDX-License-Identifier: Apache-2.0
 
-from pathlib import Path
+from pathlib import Path, PurePath
+from typing import List
+
+import pyarrow as pa
+from pyarrow import fs
 
 from kukur.inspect import DataOptions, FileOptions, InspectedPath, ResourceType
+from kukur.inspect.arrow import inspect
 from kukur.inspect.filesystem import (
     inspect_filesystem,
     preview_filesystem,
@@ -42,6 +47,14 @@ def test_preview_filesystem_limit_rows() -> None:
     assert len(results) == 10
 
 
+def test_preview_filesystem_columns() -> None:
+    path = Path("tests/test_data/feather/row.feather")
+    results = preview_filesystem(path, 10, DataOptions(column_names=["ts", "value"]))
+    assert results is not None
+    assert len(results) == 10
+    assert results.column_names == ["ts", "value"]
+
+
 def test_read_filesystem() -> None:
     path = Path("tests/test_data/feather/row.feather")
     results = list(read_filesystem(path))
@@ -70,6 +83,95 @@ def test_inspect_filesystem_detect_delta_table() -> None:
     assert not any(result.resource_type == ResourceType.DELTA for result in results)
 
 
+def test_inspect_filesystem_detect_delta_keeps_order() -> None:
+    path = Path("tests/test_data/delta/")
+
+    detected = inspect_filesystem(path, options=FileOptions(detect_delta=True))
+    listed = inspect_filesystem(path)
+    assert [result.path for result in detected] == [result.path for result in listed]
+
+
+def test_inspect_filesystem_detect_delta_recursive() -> None:
+    path = Path("tests/test_data/delta/")
+
+    results = inspect_filesystem(
+        path, options=FileOptions(detect_delta=True, recursive=True)
+    )
+    assert InspectedPath(ResourceType.DELTA, str(path / "delta-row")) in results
+    assert (
+        InspectedPath(ResourceType.DIRECTORY, str(path / "delta-row" / "_delta_log"))
+        in results
+    )
+
+
+def test_inspect_filesystem_detect_delta_partitions() -> None:
+    path = Path("tests/test_data/delta/partitions/day")
+
+    results = inspect_filesystem(path, options=FileOptions(detect_delta=True))
+    partitions = [result for result in results if "DAY=" in result.path]
+    assert len(partitions) == 4
+    assert all(result.resource_type == ResourceType.DIRECTORY for result in partitions)
+
+
+def test_inspect_filesystem_detect_delta_flat_scan() -> None:
+    path = Path("tests/test_data/delta/")
+
+    results = inspect_filesystem(
+        path, options=FileOptions(detect_delta=True, flat_scan=True)
+    )
+    assert results == inspect_filesystem(path, options=FileOptions(detect_delta=True))
+
+
+def _make_partition_with_delta_log(path: Path) -> None:
+    (path / "year=2024" / "_delta_log").mkdir(parents=True)
+    (path / "table" / "_delta_log").mkdir(parents=True)
+
+
+def _get_resource_type(results: List[InspectedPath], path: Path) -> ResourceType:
+    return next(result.resource_type for result in results if result.path == str(path))
+
+
+def test_inspect_filesystem_detect_delta_partition_with_log(tmp_path: Path) -> None:
+    _make_partition_with_delta_log(tmp_path)
+    results = inspect_filesystem(tmp_path, options=FileOptions(detect_delta=True))
+    assert _get_resource_type(results, tmp_path / "year=2024") == ResourceType.DIRECTORY
+    assert _get_resource_type(results, tmp_path / "table") == ResourceType.DELTA
+
+
+def test_inspect_filesystem_detect_delta_recursive_partition_with_log(
+    tmp_path: Path,
+) -> None:
+    _make_partition_with_delta_log(tmp_path)
+    results = inspect_filesystem(
+        tmp_path, options=FileOptions(detect_delta=True, recursive=True)
+    )
+    assert _get_resource_type(results, tmp_path / "year=2024") == ResourceType.DIRECTORY
+    assert _get_resource_type(results, tmp_path / "table") == ResourceType.DELTA
+
+
+def test_inspect_filesystem_detect_delta_flat_scan_partition_with_log(
+    tmp_path: Path,
+) -> None:
+    _make_partition_with_delta_log(tmp_path)
+    results = inspect_filesystem(
+        tmp_path, options=FileOptions(detect_delta=True, flat_scan=True)
+    )
+    assert _get_resource_type(results, tmp_path / "year=2024") == ResourceType.DIRECTORY
+    assert _get_resource_type(results, tmp_path / "table") == ResourceType.DELTA
+
+
+def test_inspect_detect_delta_on_remote_filesystem() -> None:
+    filesystem = fs.SubTreeFileSystem("tests/test_data", fs.LocalFileSystem())
+
+    results = inspect(filesystem, PurePath("delta"), FileOptions(detect_delta=True))
+    assert inspect_filesystem(
+        Path("tests/test_data/delta"), options=FileOptions(detect_delta=True)
+    ) == [
+        InspectedPath(result.resource_type, f"tests/test_data/{result.path}")
+        for result in results
+    ]
+
+
 def test_inspect_filesystem_delta_table() -> None:
     path = Path("tests/test_data/delta/delta-row")
     results = inspect_filesystem(path)
@@ -154,6 +256,44 @@ def test_read_filesystem_orc() -> None:
     assert len(batches[0]) == 47
 
 
+def test_inspect_filesystem_arrows() -> None:
+    path = Path("tests/test_data/arrows")
+    paths = inspect_filesystem(path)
+    arrows_paths = [blob for blob in paths if blob.path.endswith("row.arrows")]
+    assert len(arrows_paths) == 1
+    assert arrows_paths[0].resource_type == ResourceType.ARROWS
+
+
+def test_preview_filesystem_arrows() -> None:
+    path = Path("tests/test_data/arrows/row.arrows")
+    result = preview_filesystem(path, 10)
+    assert result is not None
+    assert len(result) == 10
+
+
+def test_preview_filesystem_arrows_batches(tmp_path: Path) -> None:
+    path = tmp_path / "batches.arrows"
+    schema = pa.schema([("ts", pa.int64()), ("value", pa.float64())])
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_stream(sink, schema) as writer:
+        for i in range(5):
+            writer.write_batch(
+                pa.record_batch(
+                    [list(range(i * 4, i * 4 + 4)), [1.5] * 4], schema=schema
+                )
+            )
+    result = preview_filesystem(path, 6, DataOptions(column_names=["ts"]))
+    assert result is not None
+    assert result.column_names == ["ts"]
+    assert result.column("ts").to_pylist() == [0, 1, 2, 3, 4, 5]
+
+
+def test_read_filesystem_arrows() -> None:
+    path = Path("tests/test_data/arrows/row.arrows")
+    batches = list(read_filesystem(path, DataOptions(column_names=["value"])))
+    assert sum(len(batch) for batch in batches) == 47
+    assert batches[0].schema.names == ["value"]
+
+
 def test_recursive() -> None:
     path = Path("tests/test_data/csv/recursive")
     paths = inspect_filesystem(path, options=FileOptions(recursive=True))
@@ -171,3 +311,38 @@ def test_default_resource_type() -> None:
     )
     assert len(paths) == 1
     assert paths[0].resource_type == ResourceType.CSV
+
+
+def test_read_filesystem_readahead() -> None:
+    path = Path("tests/test_data/parquet/dir/test-tag-1.parquet")
+    expected = pa.Table.from_batches(read_filesystem(path))
+    results = pa.Table.from_batches(
+        read_filesystem(path, DataOptions(batch_readahead=0, fragment_readahead=0))
+    )
+    assert results.equals(expected)
+
+
+def test_read_filesystem_batch_size() -> None:
+    path = Path("tests/test_data/parquet/dir/test-tag-1.parquet")
+    results = list(read_filesystem(path, DataOptions(batch_size=2)))
+    assert [batch.num_rows for batch in results] == [2, 2, 1]
+
+    path = Path("tests/test_data/csv/dir/test-tag-1.csv")
+    results = list(
+        read_filesystem(path, DataOptions(csv_header_row=False, batch_size=2))
+    )
+    assert sum(batch.num_rows for batch in results) == 5
+    assert all(batch.num_rows <= 2 for batch in results)
+
+
+def test_read_filesystem_gpx() -> None:
+    path = Path("tests/test_data/gpx/20240501.gpx")
+    results = list(read_filesystem(path, DataOptions(column_names=["ts", "lat"])))
+    assert sum(batch.num_rows for batch in results) == 2263
+    assert all(batch.schema.names == ["ts", "lat"] for batch in results)
+
+
+def test_inspect_filesystem_single_file() -> None:
+    path = Path("tests/test_data/parquet/dir/test-tag-1.parquet")
+    results = inspect_filesystem(path)
+    assert results == [InspectedPath(ResourceType.PARQUET, str(path))]
@@ -0,0 +1,85 @@
+"""Test the postgres inspect functions."""
+
+# SPDX-FileCopyrightText: 2025 Timeseer.AI
+# SPDX-License-Identifier: Apache-2.0
+
+from decimal import Decimal
+from typing import List, NamedTuple, Optional, Sequence
+
+import pyarrow as pa
+import pytest
+
+from kukur.inspect.postgres import PostgresPsycopg
+
+pytest.importorskip("psycopg")
+
+
+class FakeColumn(NamedTuple):
+    """A cursor description entry."""
+
+    name: str
+    type_code: int
+    display_size: Optional[int] = None
+    internal_size: Optional[int] = None
+    precision: Optional[int] = None
+    scale: Optional[int] = None
+    null_ok: Optional[bool] = None
+
+
+class FakeCursor:
+    """A cursor that only has a description once a query was executed."""
+
+    def __init__(self, rows: List[Sequence]):
+        self.__rows = rows
+        self.__executed = False
+
+    def execute(self, query, params=None) -> None:
+        self.__executed = True
+
+    @property
+    def description(self) -> List[FakeColumn]:
+        assert self.__executed
+        return [FakeColumn("ts", 20), FakeColumn("value", 1700, precision=10, scale=2)]
+
+    def fetchall(self) -> List[Sequence]:
+        return self.fetchmany(len(self.__rows))
+
+    def fetchmany(self, size: int) -> List[Sequence]:
+        rows = self.__rows[:size]
+        self.__rows = self.__rows[size:]
+        return rows
+
+
+class FakeConnection:
+    """A connection that records the name of the cursors it creates."""
+
+    def __init__(self, cursor: FakeCursor):
+        self.__cursor = cursor
+        self.cursor_names: List[Optional[str]] = []
+
+    def cursor(self, name: Optional[str] = None) -> FakeCursor:
+        self.cursor_names.append(name)
+        return self.__cursor
+
+
+def test_read_database_server_side_cursor(monkeypatch) -> None:
+    connection = FakeConnection(FakeCursor([(1, Decimal("1.5")), (2, Decimal("2.25"))]))
+    postgres = PostgresPsycopg("")
+    monkeypatch.setattr(postgres, "_connect", lambda: connection)
+    batches = list(postgres.read_database("public/data"))
+    assert connection.cursor_names == ["kukur_read"]
+    assert batches[0].schema == pa.schema(
+        [("ts", pa.int64()), ("value", pa.decimal128(10, 2))]
+    )
+    assert sum(batch.num_rows for batch in batches) == 2
+
+
+def test_preview_and_read_database_schemas_agree(monkeypatch) -> None:
+    rows = [(1, Decimal("1.5")), (2, Decimal("2.25"))]
+    postgres = PostgresPsycopg("")
+    monkeypatch.setattr(postgres, "_connect", lambda: FakeConnection(FakeCursor(rows)))
+    preview = postgres.preview_database("public/data")
+    monkeypatch.setattr(postgres, "_connect", lambda: FakeConnection(FakeCursor(rows)))
+    batches = list(postgres.read_database("public/data"))
+    assert preview is not None
+    assert preview.schema == batches[0].schema
@@ -0,0 +1,22 @@
+"""Test the Inspect functions for AWS S3."""
+
+# SPDX-FileCopyrightText: 2025 Timeseer.AI
+# SPDX-License-Identifier: Apache-2.0
+
+from urllib.parse import urlparse
+
+from kukur.inspect import InspectedPath, ResourceType
+from kukur.inspect.s3 import _remove_bucket_from_path
+
+
+def test_remove_bucket_from_path() -> None:
+    blob_uri = urlparse("s3://bucket/dir")
+    paths = [
+        InspectedPath(ResourceType.DIRECTORY, "bucket/dir/sub"),
+        InspectedPath(ResourceType.PARQUET, "bucket/dir/data.parquet"),
+    ]
+    results = _remove_bucket_from_path(blob_uri, paths)
+    assert results == [
+        InspectedPath(ResourceType.DIRECTORY, "dir/sub"),
+        InspectedPath(ResourceType.PARQUET, "dir/data.parquet"),
+    ]
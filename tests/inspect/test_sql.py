@@ -0,0 +1,122 @@
+"""Test the helpers shared by the database inspectors."""
+
+# SPDX-FileCopyrightText: 2025 Timeseer.AI
+# SPDX-License-Identifier: Apache-2.0
+
+from decimal import Decimal
+from typing import List, Sequence
+
+import pyarrow as pa
+import pytest
+
+import kukur.inspect.sql
+from kukur.exceptions import InvalidDataError
+from kukur.inspect.sql import get_decimal_type, read_batches, to_record_batch
+
+
+class FakeCursor:
+    """A DB-API cursor that returns the given rows."""
+
+    def __init__(self, rows: List[Sequence]):
+        self.__rows = rows
+        self.fetch_count = 0
+
+    def fetchmany(self, size: int) -> List[Sequence]:
+        self.fetch_count = self.fetch_count + 1
+        rows = self.__rows[:size]
+        self.__rows = self.__rows[size:]
+        return rows
+
+
+def test_empty_result_keeps_columns() -> None:
+    batch = to_record_batch([], ["ts", "value"], [None, None])
+    assert batch.schema.names == ["ts", "value"]
+    assert batch.num_rows == 0
+
+
+def test_read_batches_empty_result() -> None:
+    batches = list(read_batches(FakeCursor([]), ["ts", "value"], [None, None]))
+    assert len(batches) == 1
+    assert batches[0].schema.names == ["ts", "value"]
+    assert batches[0].num_rows == 0
+
+
+def test_read_batches_multiple_batches(monkeypatch) -> None:
+    monkeypatch.setattr(kukur.inspect.sql, "READ_BATCH_ROWS", 2)
+    rows = [(i, f"v{i}") for i in range(5)]
+    batches = list(read_batches(FakeCursor(rows), ["id", "value"], [None, None]))
+    assert [batch.num_rows for batch in batches] == [2, 2, 1]
+    table = pa.Table.from_batches(batches)
+    assert table.schema == pa.schema([("id", pa.int64()), ("value", pa.string())])
+    assert table.column("id").to_pylist() == list(range(5))
+
+
+def test_read_batches_leading_null_batch(monkeypatch) -> None:
+    monkeypatch.setattr(kukur.inspect.sql, "READ_BATCH_ROWS", 2)
+    rows = [(1, None), (2, None), (3, 1.5), (4, None)]
+    batches = list(
+        read_batches(FakeCursor(rows), ["id", "value"], [None, pa.float64()])
+    )
+    assert [batch.num_rows for batch in batches] == [2, 2]
+    for batch in batches:
+        assert batch.schema.field("value").type == pa.float64()
+    table = pa.Table.from_batches(batches)
+    assert table.column("value").to_pylist() == [None, None, 1.5, None]
+
+
+def test_read_batches_all_null_column_streams(monkeypatch) -> None:
+    monkeypatch.setattr(kukur.inspect.sql, "READ_BATCH_ROWS", 2)
+    cursor = FakeCursor([(i, None) for i in range(100)])
+    batches = read_batches(cursor, ["id", "value"], [None, None])
+    first_batch = next(batches)
+    assert cursor.fetch_count == 1
+    assert first_batch.schema.field("value").type == pa.null()
+    assert sum(batch.num_rows for batch in batches) == 98
+
+
+def test_read_batches_untyped_null_column_then_values(monkeypatch) -> None:
+    monkeypatch.setattr(kukur.inspect.sql, "READ_BATCH_ROWS", 2)
+    rows = [(1, None), (2, None), (3, 1.5)]
+    with pytest.raises(InvalidDataError):
+        list(read_batches(FakeCursor(rows), ["id", "value"], [None, None]))
+
+
+def test_read_batches_decimal_scale_changes(monkeypatch) -> None:
+    monkeypatch.setattr(kukur.inspect.sql, "READ_BATCH_ROWS", 2)
+    rows = [(Decimal("1.5"),), (Decimal("2.5"),), (Decimal("1.2345"),)]
+    batches = list(read_batches(FakeCursor(rows), ["value"], [get_decimal_type(10, 4)]))
+    table = pa.Table.from_batches(batches)
+    assert table.schema.field("value").type == pa.decimal128(10, 4)
+    assert table.column("value").to_pylist() == [
+        Decimal("1.5"),
+        Decimal("2.5"),
+        Decimal("1.2345"),
+    ]
+
+
+def test_read_batches_decimal_precision_changes(monkeypatch) -> None:
+    monkeypatch.setattr(kukur.inspect.sql, "READ_BATCH_ROWS", 2)
+    rows = [(Decimal("1.5"),), (Decimal("2.5"),), (Decimal("12345678.5"),)]
+    batches = list(read_batches(FakeCursor(rows), ["value"], [None]))
+    table = pa.Table.from_batches(batches)
+    assert table.schema.field("value").type == pa.decimal128(38, 1)
+    assert table.column("value").to_pylist()[-1] == Decimal("12345678.5")
+
+
+def test_preview_and_read_decimal_types_agree() -> None:
+    rows = [(Decimal("1.25"),), (Decimal("2.5"),)]
+    preview = to_record_batch(rows, ["value"], [None])
+    batches = list(read_batches(FakeCursor(rows), ["value"], [None]))
+    assert preview.schema == batches[0].schema
+
+
+def test_read_batches_no_float_truncation(monkeypatch) -> None:
+    monkeypatch.setattr(kukur.inspect.sql, "READ_BATCH_ROWS", 2)
+    rows = [(1,), (2,), (3.5,)]
+    with pytest.raises(InvalidDataError):
+        list(read_batches(FakeCursor(rows), ["value"], [None]))
+
+
+def test_to_record_batch_no_float_truncation() -> None:
+    with pytest.raises(InvalidDataError):
+        to_record_batch([(1.5,)], ["value"], [pa.int64()])
@@ -6,11 +6,12 @@ They use the client to request data.
 # SPDX-FileCopyrightText: 2022 Timeseer.AI
 # SPDX-License-Identifier: Apache-2.0
 
+import asyncio
 from datetime import datetime
 
 import pytest
 
-from kukur import Client, Metadata, SeriesSelector
+from kukur import AsyncClient, Client, Metadata, SeriesSelector
 from kukur.base import SeriesSearch
 from kukur.metadata import fields
 
@@ -42,6 +43,14 @@ def test_search(client: Client):
     assert dictionary.mapping[1] == "ON"
 
 
+def test_search_batch(client: Client):
+    many_series = list(client.search_batch(SeriesSelector("row")))
+    assert len(many_series) == 5
+    assert [repr(series) for series in many_series] == [
+        repr(series) for series in client.search(SeriesSelector("row"))
+    ]
+
+
 def test_search_custom_metadata(client: Client):
     all_metadata = list(client.search(SeriesSelector("custom-fields")))
     assert len(all_metadata) == 1
@@ -81,6 +90,35 @@ def test_data(client: Client):
     assert data["value"][6].as_py() == 1.0
 
 
+def test_data_stream(client: Client):
+    start_date = datetime.fromisoformat("2020-01-01T00:00:00+00:00")
+    end_date = datetime.fromisoformat("2021-01-01T00:00:00+00:00")
+    selector = SeriesSelector("row", "test-tag-6")
+    batches = list(client.get_data_stream(selector, start_date, end_date))
+    assert sum(len(batch) for batch in batches) == 7
+    assert batches[0]["ts"][0].as_py() == start_date
+
+
+def test_data_async(client: Client):
+    start_date = datetime.fromisoformat("2020-01-01T00:00:00+00:00")
+    end_date = datetime.fromisoformat("2021-01-01T00:00:00+00:00")
+    async_client = AsyncClient(client)
+
+    async def get_all_data():
+        return await asyncio.gather(
+            async_client.get_data(
+                SeriesSelector("row", "test-tag-6"), start_date, end_date
+            ),
+            async_client.get_data(
+                SeriesSelector("row", "test-tag-1"), start_date, end_date
+            ),
+        )
+
+    dictionary_data, data = asyncio.run(get_all_data())
+    assert len(dictionary_data) == 7
+    assert len(data) == 5
+
+
 def test_data_with_quality(client: Client):
     start_date = datetime.fromisoformat("2020-01-01T00:00:00+00:00")
     end_date = datetime.fromisoformat("2021-01-01T00:00:00+00:00")
@@ -181,3 +219,15 @@ def test_get_metadata_for_series_without_metadata(client: Client):
             ),
         )
     assert error.match("Metadata not found")
+
+
+def test_metadata_many(client: Client):
+    selectors = [
+        SeriesSelector("row", "test-tag-6"),
+        SeriesSelector("row", "test-tag-1"),
+    ]
+    all_metadata = client.get_metadata_many(selectors)
+    assert len(all_metadata) == 2
+    assert all_metadata[0].series == selectors[0]
+    assert all_metadata[0].get_field(fields.Description) == "Valve X"
+    assert all_metadata[1].series == selectors[1]
@@ -0,0 +1,84 @@
+"""Test the api key service layer."""
+
+# SPDX-FileCopyrightText: 2025 Timeseer.AI
+# SPDX-License-Identifier: Apache-2.0
+
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+from kukur.api_key import app
+from kukur.api_key.app import ApiKeys
+from kukur.repository import MigrationRunner, RepositoryRegistry
+
+
+@pytest.fixture
+def api_keys(tmp_path: Path, monkeypatch) -> ApiKeys:
+    monkeypatch.setattr(app, "_VERIFIED_API_KEYS", {})
+    repository = RepositoryRegistry(data_dir=tmp_path)
+    migration_runner = MigrationRunner()
+    migration_runner.register(repository.api_key().migrations())
+    migration_runner.migrate()
+    return ApiKeys(repository)
+
+
+@pytest.fixture
+def hash_calls(monkeypatch) -> List[str]:
+    calls: List[str] = []
+    hash_api_key = app._hash_api_key
+
+    def _counting_hash_api_key(api_key: str, salt: bytes) -> bytes:
+        calls.append(api_key)
+        return hash_api_key(api_key, salt)
+
+    monkeypatch.setattr(app, "_hash_api_key", _counting_hash_api_key)
+    return calls
+
+
+def _verified_api_keys() -> Dict[bytes, bytes]:
+    return app._VERIFIED_API_KEYS
+
+
+def test_cache_hit_skips_scrypt(api_keys: ApiKeys, hash_calls: List[str]) -> None:
+    api_key = api_keys.create("test")
+    hash_calls.clear()
+    assert api_keys.is_valid("test", api_key)
+    assert api_keys.is_valid("test", api_key)
+    assert len(hash_calls) == 1
+
+
+def test_revoked_key_rejected(api_keys: ApiKeys) -> None:
+    api_key = api_keys.create("test")
+    assert api_keys.is_valid("test", api_key)
+    api_keys.revoke("test")
+    assert not api_keys.is_valid("test", api_key)
+
+
+def test_recreated_key_rejected(api_keys: ApiKeys) -> None:
+    api_key = api_keys.create("test")
+    assert api_keys.is_valid("test", api_key)
+    api_keys.revoke("test")
+    new_api_key = api_keys.create("test")
+    assert not api_keys.is_valid("test", api_key)
+    assert api_keys.is_valid("test", new_api_key)
+
+
+def test_invalid_key_not_cached(api_keys: ApiKeys, hash_calls: List[str]) -> None:
+    api_keys.create("test")
+    hash_calls.clear()
+    assert not api_keys.is_valid("test", "invalid")
+    assert not api_keys.is_valid("test", "invalid")
+    assert len(hash_calls) == 2
+    assert len(_verified_api_keys()) == 0
+
+
+def test_cache_cleared_when_full(api_keys: ApiKeys, monkeypatch) -> None:
+    monkeypatch.setattr(app, "MAX_VERIFIED_API_KEYS", 2)
+    api_key_names = ["a", "b", "c"]
+    created = {name: api_keys.create(name) for name in api_key_names}
+    assert api_keys.is_valid("a", created["a"])
+    assert api_keys.is_valid("b", created["b"])
+    assert len(_verified_api_keys()) == 2
+    assert api_keys.is_valid("c", created["c"])
+    assert len(_verified_api_keys()) == 1
@@ -0,0 +1,132 @@
+"""Test the Arrow Flight client."""
+
+# SPDX-FileCopyrightText: 2025 Timeseer.AI
+# SPDX-License-Identifier: Apache-2.0
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Generator, List, Optional
+
+import pyarrow as pa
+import pyarrow.flight as fl
+import pytest
+
+from kukur import SeriesSelector
+from kukur import client as client_module
+from kukur.client import AsyncClient, Client, _apply_default_range
+
+
+def test_default_range() -> None:
+    start_date, end_date = _apply_default_range(None, None)
+    assert end_date - start_date == timedelta(days=365)
+    assert end_date.tzinfo == timezone.utc
+
+
+def test_default_range_keeps_dates() -> None:
+    start_date = datetime(2024, 2, 29, tzinfo=timezone.utc)
+    end_date = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    assert _apply_default_range(start_date, end_date) == (start_date, end_date)
+
+
+def test_list_sources_cached(monkeypatch) -> None:
+    client = Client()
+    responses = [["a"], ["a", "b"]]
+    monkeypatch.setattr(client, "_request_sources", lambda: responses.pop(0))
+    assert client.list_sources() == ["a"]
+    assert client.list_sources() == ["a"]
+    client.invalidate_sources()
+    assert client.list_sources() == ["a", "b"]
+
+
+class FakeAuthStream:
+    """One side of an authentication handshake."""
+
+    def __init__(self, message: bytes = b""):
+        self.message = message
+
+    def write(self, message: bytes) -> None:
+        self.message = message
+
+    def read(self) -> bytes:
+        return self.message
+
+
+class FakeServer:
+    """A Kukur server that can reject the tokens it handed out."""
+
+    def __init__(self):
+        self.handshakes = 0
+        self.reject_cached_tokens = False
+
+    def connect(self, location: Any, **kwargs: Any) -> "FakeFlightClient":
+        return FakeFlightClient(self)
+
+
+class FakeFlightClient:
+    """A FlightClient connected to a FakeServer."""
+
+    def __init__(self, server: FakeServer):
+        self.__server = server
+
+    def authenticate(self, auth_handler: Any) -> None:
+        self.__server.handshakes = self.__server.handshakes + 1
+        outgoing = FakeAuthStream()
+        auth_handler.authenticate(outgoing, FakeAuthStream(outgoing.message))
+
+    def do_action(
+        self, action: Any, options: Optional[fl.FlightCallOptions] = None
+    ) -> Generator[fl.Result, None, None]:
+        if options is not None and self.__server.reject_cached_tokens:
+            raise fl.FlightUnauthenticatedError("invalid token")
+        yield fl.Result(b'["a"]')
+
+    def close(self) -> None:
+        pass
+
+
+@pytest.fixture
+def server(monkeypatch) -> FakeServer:
+    server = FakeServer()
+    monkeypatch.setattr(client_module, "_TOKEN_CACHE", {})
+    monkeypatch.setattr(client_module.fl, "FlightClient", server.connect)
+    return server
+
+
+def test_token_cache_hit(server: FakeServer) -> None:
+    Client(api_key=("name", "key")).list_sources()
+    Client(api_key=("name", "key")).list_sources()
+    assert server.handshakes == 1
+    for token_key in client_module._TOKEN_CACHE:
+        assert "key" not in token_key
+
+
+def test_token_cache_recovers_after_auth_failure(server: FakeServer) -> None:
+    Client(api_key=("name", "key")).list_sources()
+    server.reject_cached_tokens = True
+    client = Client(api_key=("name", "key"))
+    assert client.list_sources() == ["a"]
+    assert server.handshakes == 2
+    assert client.list_sources() == ["a"]
+
+
+def test_async_get_data_stream(monkeypatch) -> None:
+    client = Client()
+    batch = pa.record_batch([pa.array([1.0])], names=["value"])
+
+    def get_data_stream(*args: Any) -> Generator[pa.RecordBatch, None, None]:
+        yield batch
+        yield batch
+
+    monkeypatch.setattr(client, "get_data_stream", get_data_stream)
+
+    async def read_all() -> List[pa.RecordBatch]:
+        selector = SeriesSelector("source", "series")
+        return [batch async for batch in AsyncClient(client).get_data_stream(selector)]
+
+    assert asyncio.run(read_all()) == [batch, batch]
+
+
+def test_async_list_sources(monkeypatch) -> None:
+    client = Client()
+    monkeypatch.setattr(client, "_request_sources", lambda: ["a"])
+    assert asyncio.run(AsyncClient(client).list_sources()) == ["a"]
@@ -0,0 +1,53 @@
+"""Test JSON (de)serialization with and without orjson."""
+
+# SPDX-FileCopyrightText: 2025 Timeseer.AI
+# SPDX-License-Identifier: Apache-2.0
+
+import json
+
+import pyarrow as pa
+import pytest
+
+from kukur import SeriesSelector, _json
+
+
+@pytest.fixture(params=[True, False])
+def has_orjson(request, monkeypatch) -> bool:
+    if request.param and not _json.HAS_ORJSON:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(_json, "HAS_ORJSON", request.param)
+    return request.param
+
+
+def test_dumps_bytes(has_orjson) -> None:
+    data = SeriesSelector("test", {"series name": "é", "location": "a"}).to_data()
+    serialized = _json.dumps(data)
+    assert isinstance(serialized, bytes)
+    assert json.loads(serialized) == data
+
+
+def test_dumps_int_keys(has_orjson) -> None:
+    assert json.loads(_json.dumps({1: "ON"})) == {"1": "ON"}
+
+
+def test_loads(has_orjson) -> None:
+    assert _json.loads(b'{"a": [1, 2.5, null]}') == {"a": [1, 2.5, None]}
+    assert _json.loads('{"a": "b"}') == {"a": "b"}
+
+
+def test_dumps_compact(has_orjson) -> None:
+    assert _json.dumps({"a": [1, 2]}) == b'{"a":[1,2]}'
+
+
+def test_loads_buffer(has_orjson) -> None:
+    buffer = pa.py_buffer(b'{"a": "b"}')
+    assert _json.loads(memoryview(buffer)) == {"a": "b"}
+
+
+def test_dumps_non_ascii(has_orjson) -> None:
+    assert _json.dumps({"name": "é"}) == '{"name":"é"}'.encode("utf-8")
+
+
+def test_dumps_non_finite(has_orjson) -> None:
+    data = {"values": [1.5, float("nan"), float("inf"), -float("inf")]}
+    assert _json.dumps(data) == b'{"values":[1.5,null,null,null]}'
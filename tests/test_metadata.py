@@ -45,6 +45,14 @@ def test_repr() -> None:
     assert "'custom2': 'value2'" in repr(metadata)
 
 
+def test_identity() -> None:
+    metadata = Metadata(SERIES)
+    other = Metadata(SERIES)
+    assert metadata == metadata
+    assert metadata != other
+    assert len({metadata, other}) == 2
+
+
 def test_typed_field() -> None:
     custom_field = MetadataField[str]("custom", default="", serialized_name="custom")
     Metadata.register_field(custom_field, after_field=fields.Description)
@@ -54,6 +62,32 @@ def test_typed_field() -> None:
     assert list(metadata.iter_names())[1] == ("custom", "test")
 
 
+def test_typed_field_by_name() -> None:
+    custom_field = MetadataField[str](
+        "custom name", default="", serialized_name="customName"
+    )
+    Metadata.register_field(custom_field)
+
+    metadata = Metadata(SERIES)
+    metadata.set_field_by_name("custom name", "test")
+    assert metadata.get_field(custom_field) == "test"
+    metadata.coerce_field("customName", "other")
+    assert metadata.get_field_by_name("custom name") == "other"
+
+
+def test_field_registered_after_creation() -> None:
+    metadata = Metadata(SERIES)
+    custom_field = MetadataField[str](
+        "late name", default="", serialized_name="lateName"
+    )
+    Metadata.register_field(custom_field)
+
+    assert metadata.find_field("lateName") == custom_field
+    metadata.set_field_by_name("late name", "test")
+    assert metadata.get_field_by_name("late name") == "test"
+    assert metadata.to_data()["lateName"] == "test"
+
+
 def test_description() -> None:
     metadata = Metadata(SERIES)
     assert metadata.get_field(fields.Description) == ""
@@ -383,6 +417,14 @@ def test_data_type_coerce() -> None:
     assert metadata.get_field(fields.DataType) == DataType.DICTIONARY
 
 
+def test_data_type_str() -> None:
+    assert DataType.STRING == "STRING"
+    metadata = Metadata(SERIES)
+    metadata.coerce_field("data type", DataType.STRING)
+    assert metadata.get_field(fields.DataType) is DataType.STRING
+    assert metadata.get_field(fields.DataType) == "STRING"
+
+
 def test_dictionary_name() -> None:
     metadata = Metadata(SERIES)
     assert metadata.get_field(fields.DictionaryName) is None
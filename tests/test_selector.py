@@ -49,3 +49,16 @@ def test_from_name_strip_whitespace() -> None:
         "source", {"tag-a": "a", "tag-b": "b", "series name": "c"}, "field"
     )
     assert selector == SeriesSelector.from_name("source", " c,tag-a=a,tag-b=b::field ")
+
+
+def test_hash() -> None:
+    selector = SeriesSelector("source", {"tag-a": "a", "tag-b": "b"}, "field")
+    other = SeriesSelector("source", {"tag-b": "b", "tag-a": "a"}, "field")
+    assert selector == other
+    assert hash(selector) == hash(other)
+    assert len({selector, other, SeriesSelector("source", "a")}) == 2
+
+
+def test_name_cached() -> None:
+    selector = SeriesSelector("source", {"series name": "a"}, "field")
+    assert selector.name is selector.name